@@ -7,10 +7,15 @@ class SearchConfig(AppConfig):
     name = "inelastic_models"
     verbose_name = "Search"
     default = True
+    default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
         # ensure 'indexes' submodules are loaded
         autoload_submodules(["indexes"])
 
-        # ensure signal handlers are loaded/registered
-        from . import receivers
+        # ensure signal handlers and checks are loaded/registered
+        from . import receivers, checks
+
+        # compile the index dependency graph, warning of any cycles (see
+        # also 'checks.check_dependencies').
+        receivers.get_dependency_graph()
@@ -0,0 +1,275 @@
+from collections import OrderedDict
+from datetime import timedelta
+import logging
+
+from django.utils.timezone import now
+from django.db.models import signals
+from django.db import connections, models, router, transaction
+from django.conf import settings
+from django.apps import apps
+
+from .indexes import CHUNKSIZE
+from .models import IndexUpdate
+from .receivers import (
+    get_dependents,
+    get_signal_name,
+    index_records,
+    is_tracked,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IndexBackend:
+    """
+    The interface of backends which process the index updates dispatched
+    by signal handlers (see 'ELASTICSEARCH_INDEX_BACKEND').
+    """
+
+    def handle_instance(self, sender, instance, signal):
+        raise NotImplementedError
+
+    def handle_records(self, sender, pks):
+        """
+        Processes updates of the records of sender given by pks (e.g., those
+        affected by bulk operations).
+        """
+        raise NotImplementedError
+
+
+class QueueBackend(IndexBackend):
+    """
+    Records index updates in a database table ('IndexUpdate') such that they
+    are processed asynchronously (e.g., by the 'process_index_queue' command)
+    rather than while handling the signal.
+
+    Pending updates are unique per record and are written by the transaction
+    which dispatched them. Each batch of updates is claimed (such that
+    concurrent workers skip it) for at most 'claim_timeout' seconds while it
+    is processed. Updates which fail to be processed are retried after a
+    delay which doubles with each attempt; those which fail 'max_attempts'
+    times are abandoned and retained until they are queued again or are
+    requeued or purged (see 'get_failed').
+    """
+
+    # The number of updates processed by a single batch.
+    batch_size = getattr(settings, "ELASTICSEARCH_QUEUE_BATCH_SIZE", CHUNKSIZE)
+
+    # The number of attempts made to process an update and the delay (in
+    # seconds) before the first retry.
+    max_attempts = getattr(settings, "ELASTICSEARCH_QUEUE_MAX_ATTEMPTS", 5)
+    retry_delay = getattr(settings, "ELASTICSEARCH_QUEUE_RETRY_DELAY", 30)
+
+    # The number of seconds after which the updates claimed by a batch are
+    # made available again (e.g., if the worker processing it was stopped).
+    claim_timeout = getattr(settings, "ELASTICSEARCH_QUEUE_CLAIM_TIMEOUT", 300)
+
+    def handle_instance(self, sender, instance, signal):
+        model = type(instance)
+        if not is_tracked(model):
+            logger.debug("Skipping non-depended type '{}'".format(model))
+            return
+
+        records = [(instance._meta.model, instance.pk)]
+
+        # deleted records cannot be resolved once the update is processed and
+        # so their dependents are evaluated immediately.
+        if signal == signals.post_delete:
+            for dependent_model, pk_set in get_dependents(instance).items():
+                records.extend((dependent_model, pk) for pk in pk_set)
+
+        logger.debug(
+            "Queueing {} index updates for '{}' via {}...".format(
+                len(records), instance, get_signal_name(signal)
+            )
+        )
+        self.enqueue(records)
+
+    def handle_records(self, sender, pks):
+        logger.debug(
+            "Queueing {} index updates of {}...".format(
+                len(pks), sender._meta.verbose_name
+            )
+        )
+        self.enqueue((sender, pk) for pk in pks)
+
+    def enqueue(self, records):
+        """
+        Queues updates of the given (model, pk) records, replacing any
+        updates of the same records which are pending.
+        """
+        timestamp = now()
+        updates = OrderedDict()
+        for model, pk in records:
+            key = (model._meta.label, str(pk))
+            updates[key] = IndexUpdate(
+                label=key[0],
+                object_id=key[1],
+                queued_on=timestamp,
+                available_on=timestamp,
+            )
+
+        using = router.db_for_write(IndexUpdate)
+        features = connections[using].features
+        update_fields = ["queued_on", "available_on", "attempts", "last_error"]
+
+        if features.supports_update_conflicts_with_target:
+            IndexUpdate.objects.using(using).bulk_create(
+                list(updates.values()),
+                update_conflicts=True,
+                unique_fields=["label", "object_id"],
+                update_fields=update_fields,
+            )
+        elif features.supports_update_conflicts:
+            # e.g., MySQL, which resolves conflicts on any unique constraint.
+            IndexUpdate.objects.using(using).bulk_create(
+                list(updates.values()),
+                update_conflicts=True,
+                update_fields=update_fields,
+            )
+        else:
+            with transaction.atomic(using=using):
+                pending = models.Q()
+                for label, object_id in updates:
+                    pending |= models.Q(label=label, object_id=object_id)
+                IndexUpdate.objects.using(using).filter(pending).delete()
+                IndexUpdate.objects.using(using).bulk_create(list(updates.values()))
+
+    def get_pending(self, limit=None):
+        """
+        Returns (at most) limit updates which are due to be processed.
+
+        Within a transaction, the updates returned are locked and those
+        locked by other transactions are skipped.
+        """
+        queryset = IndexUpdate.objects.select_for_update(skip_locked=True).filter(
+            available_on__lte=now(), attempts__lt=self.max_attempts
+        )
+        return list(queryset.order_by("available_on", "pk")[: limit or self.batch_size])
+
+    def claim(self, limit=None):
+        """
+        Claims (at most) limit updates which are due to be processed, such
+        that they are not processed concurrently until 'claim_timeout' has
+        elapsed.
+        """
+        using = router.db_for_write(IndexUpdate)
+        with transaction.atomic(using=using):
+            updates = self.get_pending(limit)
+            IndexUpdate.objects.filter(pk__in=[u.pk for u in updates]).update(
+                available_on=now() + timedelta(seconds=self.claim_timeout)
+            )
+
+        return updates
+
+    def get_records(self, updates):
+        """
+        Groups the primary keys of the records given by updates by model.
+        """
+        records = OrderedDict()
+        for update in updates:
+            try:
+                model = apps.get_model(update.label)
+            except LookupError:
+                logger.warning("Discarding update of unknown model '{}'".format(update))
+                continue
+
+            pk = model._meta.pk.to_python(update.object_id)
+            records.setdefault(model, set()).add(pk)
+
+        return records
+
+    def process(self, limit=None):
+        """
+        Processes a single batch of pending updates using one bulk request
+        per indexed model (see 'index_records').
+
+        Returns a tuple giving the number of processed and failed updates.
+        """
+        claimed_on = now()
+        updates = self.claim(limit)
+        if not updates:
+            return (0, 0)
+
+        (failed, error) = (0, "")
+        try:
+            (success, failed) = index_records(self.get_records(updates))
+            if failed:
+                error = "{} items of bulk requests failed".format(failed)
+        except Exception as exc:
+            (failed, error) = (1, str(exc))
+            logger.error("Exception while processing index updates: {}".format(exc))
+
+        ids = [update.pk for update in updates]
+        if not failed:
+            # updates which were queued again while processing remain pending.
+            IndexUpdate.objects.filter(pk__in=ids, queued_on__lte=claimed_on).delete()
+            return (len(updates), 0)
+
+        self.retry(updates, error, claimed_on)
+        return (len(updates), len(updates))
+
+    def retry(self, updates, error, claimed_on=None):
+        """
+        Delays the next attempt to process the given updates.
+
+        Updates which were queued again after claimed_on (i.e., while they
+        were being processed) are left pending as queued.
+        """
+        claimed_on = now() if claimed_on is None else claimed_on
+
+        attempts = OrderedDict()
+        for update in updates:
+            attempts.setdefault(update.attempts + 1, []).append(update.pk)
+            if update.attempts + 1 >= self.max_attempts:
+                logger.error(
+                    "Abandoning update of '{}' after {} attempts: {}".format(
+                        update, update.attempts + 1, error
+                    )
+                )
+
+        for attempt, ids in attempts.items():
+            IndexUpdate.objects.filter(pk__in=ids, queued_on__lte=claimed_on).update(
+                attempts=attempt,
+                last_error=error,
+                available_on=now()
+                + timedelta(seconds=self.retry_delay * 2 ** (attempt - 1)),
+            )
+
+    def get_failed(self):
+        """
+        Returns a queryset of the updates which have been abandoned after
+        failing to be processed 'max_attempts' times.
+        """
+        return IndexUpdate.objects.filter(attempts__gte=self.max_attempts)
+
+    def retry_failed(self):
+        """
+        Makes the abandoned updates available to be processed again, as if
+        they had been queued anew. Returns the number of updates requeued.
+        """
+        return self.get_failed().update(
+            attempts=0, last_error="", queued_on=now(), available_on=now()
+        )
+
+    def purge_failed(self):
+        """
+        Deletes the abandoned updates. Returns the number of updates deleted.
+        """
+        (deleted, per_model) = self.get_failed().delete()
+        return deleted
+
+    def drain(self, limit=None):
+        """
+        Processes batches of pending updates until none are due.
+
+        Returns a tuple giving the number of processed and failed updates.
+        """
+        (processed, failed) = (0, 0)
+        while True:
+            (batch_processed, batch_failed) = self.process(limit)
+            if not batch_processed:
+                return (processed, failed)
+
+            processed += batch_processed
+            failed += batch_failed
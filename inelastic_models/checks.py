@@ -0,0 +1,21 @@
+from django.core import checks
+
+
+@checks.register()
+def check_dependencies(app_configs, **kwargs):
+    """
+    Warns of cyclic dependencies between indexed models.
+    """
+    from .receivers import get_dependency_graph
+
+    graph = get_dependency_graph()
+    return [
+        checks.Warning(
+            "Index dependencies form a cycle: {}".format(graph.describe_cycle(cycle)),
+            hint="Records of these models are revisited until no further "
+            "dependents are found.",
+            obj=cycle[0],
+            id="inelastic_models.W001",
+        )
+        for cycle in graph.cycles
+    ]
@@ -0,0 +1,101 @@
+import collections
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyGraph:
+    """
+    A compiled graph of the dependencies declared between indexed models.
+
+    Each edge leads from a model to a model whose index depends upon it (see
+    'indexes.Search.dependencies'). Models are ordered topologically such that
+    the dependents of a model follow it; models which form a cycle are given
+    in an arbitrary (but stable) order and are reported by 'cycles'.
+    """
+
+    def __init__(self, reverse_dependencies, models=()):
+        self.edges = collections.defaultdict(list)
+        for model, dependents in reverse_dependencies.items():
+            self.edges[model].extend(dependents)
+
+        # records of inheriting models are also records of their parents.
+        for model in models:
+            for parent in model._meta.parents.keys():
+                if parent is not model and parent in reverse_dependencies:
+                    self.edges[model].extend(reverse_dependencies[parent])
+
+        nodes = set(self.edges.keys())
+        for dependents in list(self.edges.values()):
+            nodes.update(dependent for (dependent, select_param) in dependents)
+
+        self.components = self.get_components(sorted(nodes, key=self.get_label))
+        self.order = [model for component in self.components for model in component]
+        self.positions = dict((model, i) for (i, model) in enumerate(self.order))
+        self.cycles = [
+            component
+            for component in self.components
+            if len(component) > 1 or component[0] in self.get_successors(component[0])
+        ]
+
+    @staticmethod
+    def get_label(model):
+        return model._meta.label
+
+    def get_dependents(self, model):
+        """
+        Returns the (dependent, select_param) pairs of the dependents of model.
+        """
+        return list(self.edges.get(model, []))
+
+    def get_successors(self, model):
+        return [dependent for (dependent, select_param) in self.get_dependents(model)]
+
+    def get_position(self, model):
+        """
+        Returns the topological position of model; models which are not
+        depended upon by any other model precede all others.
+        """
+        return self.positions.get(model, -1)
+
+    def get_components(self, nodes):
+        """
+        Computes the strongly connected components of the graph (Tarjan's
+        algorithm) in topological order.
+        """
+        (index, lowlinks, indices) = (0, {}, {})
+        (stack, on_stack, components) = ([], set(), [])
+
+        def visit(node):
+            nonlocal index
+            indices[node] = lowlinks[node] = index
+            index += 1
+            stack.append(node)
+            on_stack.add(node)
+
+            for successor in sorted(self.get_successors(node), key=self.get_label):
+                if successor not in indices:
+                    visit(successor)
+                    lowlinks[node] = min(lowlinks[node], lowlinks[successor])
+                elif successor in on_stack:
+                    lowlinks[node] = min(lowlinks[node], indices[successor])
+
+            if lowlinks[node] == indices[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member is node:
+                        break
+                components.append(sorted(component, key=self.get_label))
+
+        for node in nodes:
+            if node not in indices:
+                visit(node)
+
+        # components are found in reverse topological order.
+        return list(reversed(components))
+
+    def describe_cycle(self, cycle):
+        return ", ".join(self.get_label(model) for model in cycle)
@@ -1,4 +1,5 @@
 import datetime
+import operator
 import logging
 import copy
 
@@ -9,11 +10,42 @@ from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
 from django.db.models.fields.related import ForeignObjectRel
 from django.db import models
 from django.conf import settings
+from django.apps import apps
 
 from .utils import merge
 
 logger = logging.getLogger(__name__)
 
+SCHEMA_CACHE = {}
+
+
+def get_related_field(model, attr):
+    """
+    Returns the relation of model given by the attribute name attr, if any.
+
+    Reverse relations are resolved using their accessor names.
+    """
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        field = None
+        for _field in model._meta.get_fields():
+            if isinstance(_field, ForeignObjectRel):
+                if _field.get_accessor_name() == attr:
+                    field = _field
+
+    if field is None or not field.is_relation:
+        return None
+
+    return field
+
+
+def clear_schema_cache():
+    """
+    Discards all cached fields, mappings and settings.
+    """
+    SCHEMA_CACHE.clear()
+
 
 class SearchField:
     mapping_type = None
@@ -132,9 +164,17 @@ class AttributeField(SearchField):
         super().__init__()
 
         self.path = attr.split(".")
+        self.accessor = operator.attrgetter(attr)
         self.exclude_from_all_field = exclude_from_all_field
 
     def get_from_instance(self, instance):
+        try:
+            return self.accessor(instance)
+        except (AttributeError, ObjectDoesNotExist):
+            # Resolve missing (or null) references along the path individually.
+            return self.get_from_path(instance)
+
+    def get_from_path(self, instance):
         for attr in self.path:
             if instance is None:
                 return None
@@ -152,6 +192,42 @@ class AttributeField(SearchField):
 
         return instance
 
+    def get_related_fields(self, model):
+        """
+        Returns the relations of model traversed by this field, in order.
+        """
+        related_fields = []
+        for attr in self.path:
+            field = None if model is None else get_related_field(model, attr)
+            if field is None:
+                break
+
+            related_fields.append(field)
+            model = field.related_model
+
+        return related_fields
+
+    def get_related_lookups(self, model):
+        """
+        Analyzes the relations of model traversed by this field.
+
+        Returns a tuple of the lookups which may be given to 'select_related'
+        and 'prefetch_related', respectively, in order to fetch the related
+        records used by this field along with instances of model.
+        """
+        (select_related, prefetch_related) = ([], [])
+        many = False
+
+        for i, field in enumerate(self.get_related_fields(model), start=1):
+            lookup = "__".join(self.path[:i])
+            many = many or field.many_to_many or field.one_to_many
+            if many or field.related_model is None:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+
+        return (select_related, prefetch_related)
+
     def to_python(self, value):
         return value
 
@@ -308,6 +384,39 @@ class FieldMappingMixin:
 
         super().__init__(*args, **kwargs)
 
+    def get_schema_key(self):
+        """
+        Computes a key identifying the declared schema of this mapping.
+
+        Any change to the declared fields (including in-place changes to
+        'attribute_fields', etc.) yields a distinct key.
+        """
+        return (
+            type(self),
+            getattr(self, "model", None),
+            tuple(self.attribute_fields),
+            tuple(self.template_fields),
+            tuple(self.other_fields.items()),
+            self.use_all_field,
+            self.all_field_name,
+        )
+
+    def get_cached(self, name, builder):
+        """
+        Returns the value given by builder, memoized by name and schema.
+
+        Values are only cached once the app registry is ready.
+        """
+        if not apps.ready:
+            return builder()
+
+        key = (name, self.get_schema_key())
+        try:
+            return SCHEMA_CACHE[key]
+        except KeyError:
+            value = SCHEMA_CACHE[key] = builder()
+            return value
+
     def get_attr_field(self, attr):
         # Figure out if the attribute is a model field, and if so, use it to
         # determine the search index field type.
@@ -347,6 +456,9 @@ class FieldMappingMixin:
             raise exc
 
     def get_fields(self):
+        return dict(self.get_cached("fields", self.build_fields))
+
+    def build_fields(self):
         fields = {}
 
         if hasattr(self, "model"):
@@ -366,6 +478,31 @@ class FieldMappingMixin:
 
         return fields
 
+    def get_prefetch_plan(self, model=None):
+        """
+        Computes the lookups which may be given to 'select_related' and
+        'prefetch_related', respectively, in order to prepare instances of
+        model (by default, 'self.model') without traversing relations for
+        each instance.
+
+        Fields of nested objects (e.g., 'ObjectField') are included.
+        """
+        model = self.model if model is None else model
+
+        def build():
+            (select_related, prefetch_related) = (set(), set())
+            for field in self.get_fields().values():
+                if not isinstance(field, AttributeField):
+                    continue
+
+                (_select, _prefetch) = field.get_related_lookups(model)
+                select_related.update(_select)
+                prefetch_related.update(_prefetch)
+
+            return (sorted(select_related), sorted(prefetch_related))
+
+        return self.get_cached(("prefetch_plan", model), build)
+
     def get_index_settings(self):
         connection_info = settings.ELASTICSEARCH_CONNECTIONS[self.connection]
         options = copy.deepcopy(connection_info.get("INDEX_OPTIONS", {}))
@@ -377,9 +514,15 @@ class FieldMappingMixin:
         return {"index": options}
 
     def get_settings(self):
+        return copy.deepcopy(self.get_cached("settings", self.build_settings))
+
+    def build_settings(self):
         return merge([f.get_field_settings() for f in self.get_fields().values()])
 
     def get_mapping(self):
+        return copy.deepcopy(self.get_cached("mapping", self.build_mapping))
+
+    def build_mapping(self):
         properties = {}
 
         for name, field in self.get_fields().items():
@@ -414,6 +557,30 @@ class ObjectFieldMixin(FieldMappingMixin):
         settings = merge([settings, self.get_settings()])
         return settings
 
+    def get_related_lookups(self, model):
+        (select_related, prefetch_related) = super().get_related_lookups(model)
+
+        # The relations of nested fields may only be planned if the related
+        # model is reached by traversing relations.
+        related_fields = self.get_related_fields(model)
+        if len(related_fields) != len(self.path):
+            return (select_related, prefetch_related)
+        if related_fields[-1].related_model is None:
+            return (select_related, prefetch_related)
+
+        prefix = "__".join(self.path)
+        (_select, _prefetch) = self.get_prefetch_plan(related_fields[-1].related_model)
+        for lookup in _select:
+            lookup = "{}__{}".format(prefix, lookup)
+            if prefix in prefetch_related:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+        for lookup in _prefetch:
+            prefetch_related.append("{}__{}".format(prefix, lookup))
+
+        return (select_related, prefetch_related)
+
 
 class ObjectField(ObjectFieldMixin, AttributeField):
     mapping_type = "object"
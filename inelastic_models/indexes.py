@@ -1,28 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+import itertools
 import threading
+import hashlib
 import logging
 import pprint
-import gc
+import json
+import time
 
-from elasticsearch.helpers import bulk, BulkIndexError
+from elasticsearch.helpers import parallel_bulk, streaming_bulk
 from elasticsearch import Elasticsearch
 from elasticsearch import exceptions
 import elasticsearch.dsl as dsl
 
+from django.utils.timezone import now
 from django.conf import settings
 from django.apps import apps
-from django.db import models
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+import django
 
-from .utils import merge
-from .fields import FieldMappingMixin, KitchenSinkField
+from .utils import merge, iterate_chunks
+from .fields import AttributeField, FieldMappingMixin, KitchenSinkField
 
 logger = logging.getLogger(__name__)
 
 CACHE = threading.local()
 CHUNKSIZE = 1000
 
+SEARCH_REGISTRY = {}
+SEARCH_REGISTRY_LOCK = threading.Lock()
+
+# Supported policies governing when index writes are made visible to search:
+#
+# - 'none': writes are made visible by the index's periodic refresh.
+# - 'wait_for': requests wait for a refresh to make writes visible.
+# - 'true': requests force a refresh which makes writes visible.
+# - 'end': a single refresh is forced once a bulk request has completed;
+#   periodic refreshes of indices which are not yet live (e.g., those being
+#   rebuilt) are disabled for its duration.
+REFRESH_POLICIES = ("none", "wait_for", "true", "end")
+
 
 def get_client(connection):
-    es_client = getattr(CACHE, "es_client", None)
+    if getattr(CACHE, "es_clients", None) is None:
+        setattr(CACHE, "es_clients", {})
+
+    es_client = CACHE.es_clients.get(connection, None)
     if es_client is None:
         config = settings.ELASTICSEARCH_CONNECTIONS[connection]
         (host_list, options) = (
@@ -30,66 +55,351 @@ def get_client(connection):
             config.get("CONNECTION_OPTIONS", {}),
         )
         es_client = Elasticsearch(hosts=host_list, **options)
-        setattr(CACHE, "es_client", es_client)
+        CACHE.es_clients[connection] = es_client
 
     return es_client
 
 
-def queryset_iterator(queryset, chunksize=CHUNKSIZE):
+def get_search_meta(model):
+    """
+    Returns the long-lived 'Search' instance of the given model.
+
+    Instances are shared by all threads and are registered per model, index
+    type and connection.
+    """
+    search_cls = getattr(model, "Search")
+    key = (model, search_cls, search_cls.connection)
+
+    search_meta = SEARCH_REGISTRY.get(key, None)
+    if search_meta is None:
+        with SEARCH_REGISTRY_LOCK:
+            search_meta = SEARCH_REGISTRY.get(key, None)
+            if search_meta is None:
+                search_meta = SEARCH_REGISTRY[key] = search_cls(model=model)
+
+    return search_meta
+
+
+def clear_search_registry():
+    """
+    Discards all registered 'Search' instances (e.g., between tests).
+    """
+    with SEARCH_REGISTRY_LOCK:
+        SEARCH_REGISTRY.clear()
+
+
+def is_keyset_key(model, name):
+    """
+    Determines whether the ordering key name of model may be used to seek
+    through rows: it must name a non-null field which is reached without
+    crossing nullable, reverse or to-many relations.
+    """
+    for part in name.split("__"):
+        if model is None:
+            return False
+
+        try:
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+
+        if field.null or field.many_to_many or not field.concrete:
+            return False
+        model = field.related_model
+
+    return True
+
+
+def get_keyset_ordering(queryset, ordering=None):
+    """
+    Computes the list of ordering keys used to seek through queryset.
+
+    Ordering defaults to that of the given queryset (e.g., as configured via
+    'index_ordering') and is always terminated by the primary key in order
+    to guarantee a total ordering over the rows visited.
+
+    Returns None if the ordering cannot be expressed as a keyset (e.g., if it
+    includes nullable keys or keys across to-many relations).
     """
-    Iterate over a Django Queryset ordered by the primary key
+    if ordering is None:
+        ordering = list(queryset.query.order_by)
 
-    This method loads a maximum of chunksize (default: 1000) rows in it's
-    memory at the same time while django normally would load all rows in it's
-    memory. Using the iterator() method only causes it to not preload all the
-    classes.
+    keys = []
+    for key in ordering:
+        if not isinstance(key, str) or key == "?":
+            return None
+        name = key.lstrip("-")
+        if not is_keyset_key(queryset.model, name):
+            return None
+        if name == queryset.model._meta.pk.name:
+            key = key.replace(name, "pk")
+        keys.append(key)
+
+    if "pk" not in [key.lstrip("-") for key in keys]:
+        keys.append("pk")
+
+    return keys
+
+
+def get_keyset_filter(keys, values):
+    """
+    Builds a filter selecting rows which follow 'values' in the ordering
+    given by 'keys'.
+    """
+    seek = models.Q()
+    for i, key in enumerate(keys):
+        name = key.lstrip("-")
+        lookup = "{}__{}".format(name, "lt" if key.startswith("-") else "gt")
+        clause = models.Q(**{lookup: values[i]})
+        for prior_key, prior_value in zip(keys[:i], values[:i]):
+            clause &= models.Q(**{prior_key.lstrip("-"): prior_value})
+        seek |= clause
+
+    return seek
 
-    Note that this implementation does not support ordered query sets.
 
-    Taken from: http://djangosnippets.org/snippets/1949/
+def queryset_iterator(queryset, chunksize=CHUNKSIZE, ordering=None):
     """
-    assert queryset.exists(), "Can't iterate over empty queryset"
+    Lazily iterate over the instances of a Django Queryset.
+
+    Rows are visited in chunks of (at most) chunksize records using keyset
+    pagination: each chunk is selected by seeking past the ordering keys of
+    the last visited row rather than by offset or by re-counting the rows
+    which remain. The ordering of queryset (or that given by 'ordering') is
+    respected and may be composed of any number of non-null, non-integer or
+    related keys; the primary key is always used as a final tie-breaker.
+
+    Querysets which cannot be expressed as a keyset (e.g., sliced querysets,
+    those ordered by expressions, by nullable keys or across to-many
+    relations) are streamed using 'iterator()'.
+    """
+    keys = get_keyset_ordering(queryset, ordering)
+    if keys is None or queryset.query.is_sliced:
+        logger.debug("Falling back to non-keyset iteration of queryset.")
+        yield from queryset.iterator(chunk_size=chunksize)
+        return
+
+    queryset = queryset.order_by(*keys)
+    names = [key.lstrip("-") for key in keys]
+    (values, total) = (None, 0)
+
+    while True:
+        chunk = queryset
+        if values is not None:
+            chunk = chunk.filter(get_keyset_filter(keys, values))
+
+        if names == ["pk"]:
+            instances = list(chunk[:chunksize])
+            rows = [(instance.pk,) for instance in instances]
+        else:
+            rows = list(chunk.values_list(*names)[:chunksize])
+            instances = list(chunk.filter(pk__in=[row[-1] for row in rows]))
 
-    ordering = queryset.model._meta.pk.get_attname()
-    pk = getattr(queryset.order_by("-{}".format(ordering))[0], ordering) + 1
-    last_pk = getattr(queryset.order_by(ordering)[0], ordering)
+        if not rows:
+            break
 
-    queryset = queryset.order_by("-{}".format(ordering))
-    total = 0
-    while pk > last_pk:
-        chunk = queryset.filter(pk__lt=pk)[:chunksize]
-        pk = getattr(chunk[len(chunk) - 1], ordering)
-        total += len(chunk)
-        yield chunk
+        values = rows[-1]
+        total += len(instances)
+        yield from instances
 
-        log_msg = "Visited {} records, {} remaining"
-        logger.info(log_msg.format(total, queryset.filter(pk__lt=pk).count()))
-        gc.collect()
+        logger.info("Visited {} records".format(total))
+        if len(rows) < chunksize:
+            break
 
     logger.info("Iterated {} records".format(total))
 
 
-class TypeAwareSerializableHit(dsl.response.Hit):
-    def __init__(self, document, search_meta):
-        super().__init__(document)
+def iterate_pks(queryset, chunksize=CHUNKSIZE):
+    """
+    Lazily iterates over the primary keys of queryset in ascending order.
 
-        for name, field in search_meta.get_fields().items():
-            if name not in self:
-                continue
+    Keys are fetched in chunks of (at most) chunksize by seeking past the
+    last visited key; no instances are fetched.
+    """
+    queryset = queryset.prefetch_related(None).order_by("pk")
+    queryset = queryset.values_list("pk", flat=True)
+    last_pk = None
+
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+
+        pks = list(chunk[:chunksize])
+        yield from pks
+
+        if len(pks) < chunksize:
+            return
+        last_pk = pks[-1]
+
+
+def diff_sorted(left, right):
+    """
+    Merge-joins the ascending iterables left and right, lazily yielding
+    (item, side) pairs for the items found in only one of them, where side
+    is either 'left' or 'right'. Items which are not given in ascending
+    order raise a ValueError.
+    """
+
+    def check_sorted(iterable, side):
+        previous = None
+        for item in iterable:
+            if previous is not None and not previous < item:
+                msg = "Items of {} are not in ascending order: {} follows {}"
+                raise ValueError(msg.format(side, item, previous))
+            previous = item
+            yield item
+
+    (left, right) = (check_sorted(left, "left"), check_sorted(right, "right"))
+    (left_item, right_item) = (next(left, None), next(right, None))
+
+    while left_item is not None and right_item is not None:
+        if left_item < right_item:
+            yield (left_item, "left")
+            left_item = next(left, None)
+        elif right_item < left_item:
+            yield (right_item, "right")
+            right_item = next(right, None)
+        else:
+            (left_item, right_item) = (next(left, None), next(right, None))
 
-            self[name] = field.to_python(self[name])
+    if left_item is not None:
+        yield (left_item, "left")
+        yield from ((item, "left") for item in left)
+    if right_item is not None:
+        yield (right_item, "right")
+        yield from ((item, "right") for item in right)
 
-            # Support query result serialization (e.g., JSON) by translating
-            # non-native utility types 'AttrList', 'AttrDict'.
-            if isinstance(self[name], dsl.utils.AttrList):
-                self[name] = self[name]._l_
-            elif isinstance(self[name], dsl.utils.AttrDict):
-                self[name] = self[name]._d_
+
+def close_connections(iterable):
+    """
+    Closes the database connections of the consuming thread once iterable
+    has been exhausted.
+    """
+    try:
+        yield from iterable
+    finally:
+        connections.close_all()
+
+
+def get_pk_ranges(queryset, partitions):
+    """
+    Partitions queryset into (at most) the given number of contiguous ranges
+    of primary keys, each of which selects a roughly equal number of rows.
+
+    Ranges are given as (lower, upper) pairs where 'lower' is inclusive,
+    'upper' is exclusive and None denotes an unbounded range.
+    """
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    total = pks.count()
+    if not total:
+        return []
+
+    size = -(-total // max(1, partitions))
+    bounds = [pks[offset] for offset in range(size, total, size)]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def filter_pk_range(queryset, pk_range):
+    """
+    Restricts queryset to the given (half-open) range of primary keys.
+    """
+    (lower, upper) = pk_range
+    if lower is not None:
+        queryset = queryset.filter(pk__gte=lower)
+    if upper is not None:
+        queryset = queryset.filter(pk__lt=upper)
+    return queryset
+
+
+def init_worker():
+    """
+    Prepares a worker process to serve index requests.
+
+    Database connections and Elasticsearch clients inherited from the parent
+    process are discarded such that each worker establishes its own.
+    """
+    global CACHE
+
+    if not apps.ready:
+        django.setup()
+
+    connections.close_all()
+    CACHE = threading.local()
+    clear_search_registry()
+
+
+def bulk_index_partition(
+    label, query, pk_range, refresh=None, changed_only=False, index=None
+):
+    """
+    Indexes the records selected by query within the given range of primary keys.
+    """
+    model = apps.get_model(label)
+    queryset = model._default_manager.all()
+    queryset.query = query
+
+    queryset = filter_pk_range(queryset, pk_range)
+
+    search_meta = model._search_meta()
+    result = search_meta.bulk_index(
+        queryset, refresh=refresh, changed_only=changed_only, index=index
+    )
+    return result or (0, 0)
+
+
+class HitDecoder:
+    """
+    Converts the '_source' of hits to Python values using the fields of a
+    Search.
+
+    The fields whose values require conversion are determined once, when the
+    decoder is created, such that each hit is decoded by a tight loop over
+    only those fields. Values are decoded as native types (and so remain
+    serializable, e.g., as JSON).
+    """
+
+    def __init__(self, fields):
+        self.converters = [
+            (name, field.to_python)
+            for (name, field) in sorted(fields.items())
+            if getattr(type(field), "to_python", AttributeField.to_python)
+            is not AttributeField.to_python
+        ]
+
+    def decode(self, source):
+        """
+        Decodes the values of source in place and returns it.
+        """
+        for name, to_python in self.converters:
+            if name in source:
+                source[name] = to_python(source[name])
+        return source
+
+    def decode_hits(self, hits):
+        """
+        Decodes the '_source' of each of the given raw hits in place.
+        """
+        for hit in hits:
+            if "_source" in hit:
+                self.decode(hit["_source"])
+        return hits
+
+
+class TypeAwareSerializableHit(dsl.response.Hit):
+    def __init__(self, document, search_meta, decoder=None):
+        decoder = search_meta.get_hit_decoder() if decoder is None else decoder
+        if "_source" in document:
+            decoder.decode(document["_source"])
+
+        super().__init__(document)
 
     @classmethod
     def make_callback(cls, search_meta):
+        decoder = search_meta.get_hit_decoder()
+
         def callback(document):
-            return cls(document, search_meta)
+            return cls(document, search_meta, decoder)
 
         callback._matches = lambda x: True
         return callback
@@ -99,6 +409,61 @@ class Search(FieldMappingMixin):
     connection = getattr(settings, "ELASTICSEARCH_DEFAULT_CONNECTION", "default")
     handler = getattr(settings, "ELASTICSEARCH_INDEX_HANDLER", None)
 
+    # The dotted path of the backend (see 'backends.IndexBackend') which
+    # processes index updates dispatched by signals, e.g., asynchronously.
+    backend = getattr(settings, "ELASTICSEARCH_INDEX_BACKEND", None)
+
+    # The upper bound (in bytes) of the size of a single bulk request.
+    max_chunk_bytes = getattr(
+        settings, "ELASTICSEARCH_BULK_MAX_CHUNK_BYTES", 100 * 1024 * 1024
+    )
+
+    # The number of threads used to submit bulk requests concurrently and the
+    # number of prepared requests which may await submission. Requests are
+    # submitted serially unless 'bulk_thread_count' is greater than one.
+    #
+    # Note that records are then read and prepared by a separate thread and
+    # so will not observe any uncommitted changes of the calling thread.
+    #
+    # Either may also be configured per connection via 'BULK_OPTIONS'.
+    bulk_thread_count = None
+    bulk_queue_size = None
+
+    # The refresh policies (see 'REFRESH_POLICIES') used by requests which
+    # write a single document and by bulk requests to the live index,
+    # respectively. Bulk requests to indices which are not yet live use the
+    # 'end' policy by default.
+    refresh = getattr(settings, "ELASTICSEARCH_REFRESH", "true")
+    bulk_refresh = getattr(settings, "ELASTICSEARCH_BULK_REFRESH", "true")
+
+    # The name of the (non-indexed) field which stores a hash of the content
+    # of each document, used to detect changes without comparing documents.
+    # Set to None to disable fingerprints.
+    fingerprint_field = getattr(
+        settings, "ELASTICSEARCH_FINGERPRINT_FIELD", "_fingerprint"
+    )
+
+    # The number of fingerprints of indexed documents which are retained in
+    # memory such that an unchanged document may be detected without making
+    # a request. The cache is only accurate if this process is the sole writer
+    # to the index and so is disabled by default.
+    fingerprint_cache_size = getattr(
+        settings, "ELASTICSEARCH_FINGERPRINT_CACHE_SIZE", 0
+    )
+
+    # The number of previous versions of the index which are retained once
+    # a new version has been installed (see 'rebuild_index').
+    index_versions_retained = getattr(
+        settings, "ELASTICSEARCH_INDEX_VERSIONS_RETAINED", 0
+    )
+
+    # The number of seconds for which each process caches the names of the
+    # indices being rebuilt, to which writes are made along with the live
+    # index (see 'get_write_indices').
+    rebuild_check_interval = getattr(
+        settings, "ELASTICSEARCH_REBUILD_CHECK_INTERVAL", 10
+    )
+
     date_field = "modified_on"
 
     # A dictionary whose keys are other models that this model's index
@@ -124,6 +489,9 @@ class Search(FieldMappingMixin):
         super().__init__(*args, **kwargs)
 
         self.client = get_client(self.connection)
+        self.fingerprint_cache = OrderedDict()
+        self.fingerprint_cache_lock = threading.Lock()
+        self.rebuild_indices = (None, [])
 
     @classmethod
     def bind_to_model(cls, model):
@@ -154,22 +522,31 @@ class Search(FieldMappingMixin):
         )
         return field
 
-    def get_settings(self):
-        field_settings = super().get_settings()
+    def build_settings(self):
+        field_settings = super().build_settings()
         if self.use_all_field:
             field_settings = merge(
                 [field_settings, KitchenSinkField().get_field_settings()]
             )
         return field_settings
 
-    def get_mapping(self):
-        mapping = super().get_mapping()
+    def build_mapping(self):
+        mapping = super().build_mapping()
         if self.use_all_field:
             all_field = KitchenSinkField().get_field_mapping()
             mapping["properties"][self.all_field_name] = all_field
+        if self.fingerprint_field:
+            mapping["properties"][self.fingerprint_field] = {
+                "type": "keyword",
+                "index": False,
+                "doc_values": False,
+            }
         return mapping
 
     def get_index(self):
+        """
+        Returns the name of the alias through which the live index is used.
+        """
         index_name = settings.ELASTICSEARCH_CONNECTIONS[self.connection]["INDEX_NAME"]
         return "{}--{}".format(index_name, self.get_doc_type())
 
@@ -177,6 +554,11 @@ class Search(FieldMappingMixin):
         return "{}_{}".format(self.model._meta.app_label, self.model._meta.model_name)
 
     def get_field_type(self, fieldname):
+        return self.get_cached(
+            ("field_type", fieldname), lambda: self.build_field_type(fieldname)
+        )
+
+    def build_field_type(self, fieldname):
         mapping = self.get_mapping()
         for field in fieldname.split("."):
             mapping = mapping["properties"].get(field, None)
@@ -185,77 +567,209 @@ class Search(FieldMappingMixin):
 
         return mapping["type"]
 
-    def has_index_changed(self, instance, fields=None):
+    def serialize(self, document):
         """
-        Evaluates whether any indexed fields have changed on instance.
+        Translates document into the form in which it is stored in the index.
         """
-        index_entry = self.get_entry_mapping(instance)
-        if index_entry is None:
-            logger.debug(
-                "No matching index entry for '{}' in {} (fields={}) found".format(
-                    instance, self.get_doc_type(), fields
+        return json.loads(self.client.transport.serializers.dumps(document))
+
+    def get_fingerprint(self, document):
+        """
+        Computes a stable hash of the (serialized) content of document.
+        """
+        content = json.dumps(
+            self.serialize(document), sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_document(self, instance):
+        """
+        Prepares the document which represents instance in the index,
+        including its fingerprint.
+        """
+        document = self.prepare(instance)
+        if self.fingerprint_field:
+            document[self.fingerprint_field] = self.get_fingerprint(document)
+        return document
+
+    def get_cached_fingerprint(self, pk):
+        with self.fingerprint_cache_lock:
+            return self.fingerprint_cache.get(str(pk), None)
+
+    def set_cached_fingerprint(self, pk, fingerprint):
+        """
+        Records (or, if fingerprint is None, discards) the fingerprint
+        of the indexed document with the given primary key.
+        """
+        if not self.fingerprint_cache_size:
+            return
+
+        with self.fingerprint_cache_lock:
+            self.fingerprint_cache.pop(str(pk), None)
+            if fingerprint is None:
+                return
+
+            self.fingerprint_cache[str(pk)] = fingerprint
+            while len(self.fingerprint_cache) > self.fingerprint_cache_size:
+                self.fingerprint_cache.popitem(last=False)
+
+    def clear_fingerprint_cache(self):
+        with self.fingerprint_cache_lock:
+            self.fingerprint_cache.clear()
+
+    def get_entry_mappings(self, instances, source_includes=None):
+        """
+        Fetches the mappings which represent the given instances in the index
+        using a single request.
+
+        Returns a dictionary of the (serialized) mappings found, keyed by the
+        primary key of the corresponding instance. If 'source_includes' is
+        given, only those fields are fetched.
+        """
+        ids = [instance.pk for instance in instances]
+        params = {}
+        if source_includes is not None:
+            params["source_includes"] = source_includes
+
+        try:
+            logger.debug("Getting entry mappings for {} instances".format(len(ids)))
+            response = self.client.mget(index=self.get_index(), ids=ids, **params)
+        except exceptions.NotFoundError as exc:
+            logger.debug("No index '{}' found.".format(self.get_index()))
+            return {}
+        except exceptions.ConnectionTimeout as exc:
+            logger.warning("Index entries request timed out.")
+            return {}
+        except exceptions.ConnectionError as exc:
+            logger.warning("Index entries request encountered a connection error.")
+            return {}
+
+        return dict(
+            (doc["_id"], doc.get("_source", {}))
+            for doc in response["docs"]
+            if doc.get("found", False)
+        )
+
+    def get_changed_fingerprints(self, instances):
+        """
+        Evaluates which of the given instances have documents whose
+        fingerprints differ from those of their entries in the index.
+
+        Fingerprints found in the local cache are trusted; the remainder
+        are fetched using a single request. Returns a list of (instance,
+        document) pairs giving the prepared document of each changed instance.
+        """
+        documents = [(instance, self.get_document(instance)) for instance in instances]
+
+        pending = [
+            (instance, document)
+            for (instance, document) in documents
+            if self.get_cached_fingerprint(instance.pk)
+            != document[self.fingerprint_field]
+        ]
+        if not pending:
+            return []
+
+        index_entries = self.get_entry_mappings(
+            [instance for (instance, document) in pending],
+            source_includes=[self.fingerprint_field],
+        )
+
+        changed = []
+        for instance, document in pending:
+            fingerprint = document[self.fingerprint_field]
+            index_entry = index_entries.get(str(instance.pk), None)
+            index_fingerprint = None
+            if index_entry is not None:
+                index_fingerprint = index_entry.get(self.fingerprint_field, None)
+
+            self.set_cached_fingerprint(instance.pk, index_fingerprint)
+            if index_fingerprint != fingerprint:
+                logger.debug(
+                    "Index entry for '{}' in {} has fingerprint {} (expected {})".format(
+                        instance, self.get_doc_type(), index_fingerprint, fingerprint
+                    )
                 )
-            )
-            return True
+                changed.append((instance, document))
 
-        for name, field in self.get_fields().items():
-            if fields is not None and name not in fields:
-                logger.debug("Skipping field '{}'...".format(name))
-                continue
+        return changed
 
-            index_value = index_entry.get(name)
-            instance_value = field.get_from_instance(instance)
+    def get_changed_instances(self, instances, fields=None):
+        """
+        Evaluates which of the given instances have indexed fields whose
+        values differ from those of their entries in the index.
 
-            if (
-                not isinstance(instance_value, type(None))
-                and not isinstance(index_value, type(None))
-                and not isinstance(index_value, type(instance_value))
-            ):
+        Unless specific fields are given, fingerprints are compared (see
+        'fingerprint_field'); otherwise, entries are fetched using a single
+        request and compared in memory.
+        """
+        return [
+            instance
+            for (instance, document) in self.get_changed_documents(instances, fields)
+        ]
+
+    def get_changed_documents(self, instances, fields=None):
+        """
+        As 'get_changed_instances', but returns a list of (instance, document)
+        pairs giving the document prepared for each changed instance (or None
+        if none was prepared) such that it may be submitted without being
+        prepared again.
+        """
+        instances = list(instances)
+        if not instances:
+            return []
+
+        if fields is None and self.fingerprint_field:
+            return self.get_changed_fingerprints(instances)
+
+        index_entries = self.get_entry_mappings(instances)
+
+        changed = []
+        for instance in instances:
+            index_entry = index_entries.get(str(instance.pk), None)
+            if index_entry is None:
                 logger.debug(
-                    "Ignoring non-matching types {}, {}".format(
-                        type(index_value), type(instance_value)
+                    "No matching index entry for '{}' in {} (fields={}) found".format(
+                        instance, self.get_doc_type(), fields
                     )
                 )
-            elif hasattr(field, "model") and hasattr(field.model, "_search_meta"):
-                if isinstance(instance_value, dict) and instance_value:
-                    _queryset = field.model._search_meta().get_base_qs()
-                    _maybe_instance = _queryset.filter(pk=instance_value.get("pk"))
-                    if (
-                        _maybe_instance.exists()
-                        and field.model._search_meta().has_index_changed(
-                            _maybe_instance.get(), fields=field.get_fields().keys()
+                changed.append((instance, None))
+                continue
+
+            document = self.prepare(instance)
+            for name, instance_value in self.serialize(document).items():
+                if fields is not None and name not in fields:
+                    logger.debug("Skipping field '{}'...".format(name))
+                    continue
+
+                index_value = index_entry.get(name)
+                if index_value != instance_value:
+                    sep_length = min(80, 2 + len(str(index_value)))
+                    logger.debug(
+                        "Found mismatched index element '{}':\n {}\n {}\n {}".format(
+                            name,
+                            pprint.pformat(index_value),
+                            "".join(["^" for i in range(sep_length)]),
+                            pprint.pformat(instance_value),
                         )
-                    ):
-                        return True
-                elif isinstance(instance_value, list) and instance_value:
-                    for _el in instance_value:
-                        _queryset = field.model._search_meta().get_base_qs()
-                        _maybe_instance = _queryset.filter(pk=_el.get("pk"))
-                        if (
-                            _maybe_instance.exists()
-                            and field.model._search_meta().has_index_changed(
-                                _maybe_instance.get(), fields=field.get_fields().keys()
-                            )
-                        ):
-                            return True
-            elif index_value != instance_value:
-                sep_length = min(80, 2 + len(str(index_value)))
+                    )
+                    # documents compared by some fields only lack a fingerprint.
+                    changed.append((instance, document if fields is None else None))
+                    break
+            else:
                 logger.debug(
-                    "Found mismatched index element '{}':\n {}\n {}\n {}".format(
-                        name,
-                        pprint.pformat(index_value),
-                        "".join(["^" for i in range(sep_length)]),
-                        pprint.pformat(instance_value),
+                    "Index entry for '{}' in {} (fields={}) has not changed".format(
+                        instance, self.get_doc_type(), fields
                     )
                 )
-                return True
 
-        logger.debug(
-            "Index entry for '{}' in {} (fields={}) has not changed".format(
-                instance, self.get_doc_type(), fields
-            )
-        )
-        return False
+        return changed
+
+    def has_index_changed(self, instance, fields=None):
+        """
+        Evaluates whether any indexed fields have changed on instance.
+        """
+        return bool(self.get_changed_instances([instance], fields=fields))
 
     def should_index(self, instance):
         try:
@@ -280,6 +794,32 @@ class Search(FieldMappingMixin):
                 "Exception during 'should_dispatch_dependencies': {}".format(str(exc))
             )
 
+    def get_dispatch_dependencies(self, instances):
+        """
+        Evaluates 'should_dispatch_dependencies' for a batch of instances.
+
+        Returns the subset of instances for which updates should be dispatched.
+        """
+        if not self.dispatch_dependencies:
+            return []
+
+        # respect implementations which customize the per-instance interface.
+        if type(self).should_dispatch_dependencies is not (
+            Search.should_dispatch_dependencies
+        ):
+            return [i for i in instances if self.should_dispatch_dependencies(i)]
+
+        try:
+            return self.get_changed_instances(instances)
+        except Exception as exc:
+            import traceback
+
+            traceback.print_exc()
+            logger.error(
+                "Exception during 'get_dispatch_dependencies': {}".format(str(exc))
+            )
+            return []
+
     def get_dependencies(self):
         dependencies = self.dependencies.copy()
         for model, query in self.dependencies.items():
@@ -299,21 +839,219 @@ class Search(FieldMappingMixin):
         s = s.index(self.get_index())
         return s.doc_type(TypeAwareSerializableHit.make_callback(self))
 
-    def create_index(self):
+    def get_hit_decoder(self):
+        return self.get_cached("hit_decoder", lambda: HitDecoder(self.get_fields()))
+
+    def execute_raw(self, s=None):
         """
-        Creates an index and removes any previously-installed index mapping.
+        Executes s (by default, 'get_search') and returns the response with
+        the '_source' of its hits decoded (see 'HitDecoder').
+
+        Hits remain plain dictionaries, skipping the construction of any
+        'dsl.response.Hit', for results which are serialized directly.
         """
-        index = self.get_index()
-        es = get_client(self.connection)
+        s = self.get_search() if s is None else s
+        response = self.client.search(index=s._index, body=s.to_dict(), **s._params)
+        self.get_hit_decoder().decode_hits(response["hits"]["hits"])
+        return response
+
+    def get_instances(self, query=None, source=False):
+        """
+        Executes query (a 'dsl.Search' or a query; by default, 'get_search')
+        and returns the model instances of its hits in the order of the hits
+        (e.g., by score).
+
+        Instances are fetched along with the related records given by the
+        prefetch plan using a single query; hits whose records no longer
+        exist are omitted. Unless 'source' is given, the '_source' of hits
+        is not fetched.
+        """
+        if isinstance(query, dsl.Search):
+            s = query
+        else:
+            s = self.get_search()
+            if query is not None:
+                s = s.query(query)
+
+        if not source:
+            s = s.source(False)
+
+        pk_field = self.model._meta.pk
+        hits = self.execute_raw(s)["hits"]["hits"]
+        pks = [pk_field.to_python(hit["_id"]) for hit in hits]
+
+        instances = self.apply_prefetch_plan(self.get_base_qs()).in_bulk(pks)
+        return [instances[pk] for pk in pks if pk in instances]
+
+    def iterate(
+        self,
+        query=None,
+        sort=None,
+        page_size=CHUNKSIZE,
+        keep_alive="5m",
+        index=None,
+        raw=False,
+    ):
+        """
+        Lazily iterates over all hits of query within a consistent snapshot
+        of index (by default, the live index).
+
+        The query may be given as a 'dsl.Search' (e.g., one derived from
+        'get_search'), as a query (a 'dsl.Q' or a dictionary), or omitted
+        to match all entries. Hits are ordered by sort (by default, by
+        primary key) and fetched in pages of page_size using 'search_after'
+        within a point in time, and so are not limited by the index's
+        'max_result_window'.
 
-        if self.client.indices.exists(index=index):
-            logger.debug("Deleting index '{}'".format(index))
-            self.client.indices.delete(index=index)
+        If 'raw' is given, hits are given as plain dictionaries (see
+        'execute_raw').
+
+        The point in time is closed once the iterator is exhausted or closed
+        (e.g., using 'contextlib.closing').
+        """
+        index = self.get_index() if index is None else index
+        if isinstance(query, dsl.Search):
+            s = query
+        else:
+            s = self.get_search()
+            if query is not None:
+                s = s.query(query)
+
+        # requests within a point in time must not name an index.
+        s = s.index().sort(*(sort or [{"pk": "asc"}]))
+        s = s.extra(track_total_hits=False)[:page_size]
+
+        response = self.client.open_point_in_time(index=index, keep_alive=keep_alive)
+        pit_id = response["id"]
+        try:
+            while True:
+                page = s.extra(pit={"id": pit_id, "keep_alive": keep_alive})
+                if raw:
+                    response = self.execute_raw(page)
+                    pit_id = response.get("pit_id", pit_id)
+                    hits = response["hits"]["hits"]
+                    sort_values = [hit["sort"] for hit in hits[-1:]]
+                else:
+                    response = page.execute()
+                    pit_id = getattr(response, "pit_id", pit_id)
+                    hits = response.hits
+                    sort_values = [list(hit.meta.sort) for hit in hits[-1:]]
+
+                yield from hits
+
+                if len(hits) < page_size:
+                    return
+                s = s.extra(search_after=sort_values[0])
+        finally:
+            self.client.close_point_in_time(id=pit_id)
+
+    def get_index_version(self, version=None):
+        """
+        Returns the name of a versioned index which may be installed behind
+        the alias given by 'get_index'. Versions default to the current time.
+        """
+        if version is None:
+            version = now().strftime("%Y%m%d%H%M%S%f")
+        return "{}--{}".format(self.get_index(), version)
+
+    def get_index_versions(self):
+        """
+        Returns the names of all versioned indices, oldest first.
+        """
+        try:
+            response = self.client.indices.get_alias(
+                index=self.get_index_version("*"), expand_wildcards="all"
+            )
+        except exceptions.NotFoundError as exc:
+            return []
+
+        return sorted(response.keys())
+
+    def get_live_indices(self):
+        """
+        Returns the names of the indices given by the alias of 'get_index'.
+        """
+        try:
+            response = self.client.indices.get_alias(name=self.get_index())
+        except exceptions.NotFoundError as exc:
+            return []
+
+        return sorted(response.keys())
+
+    def get_rebuild_alias(self):
+        """
+        Returns the name of the alias given to indices which are being rebuilt.
+        """
+        return "{}--rebuild".format(self.get_index())
+
+    def get_rebuild_indices(self):
+        """
+        Returns the names of the indices which are being rebuilt; these are
+        fetched at most once every 'rebuild_check_interval' seconds.
+        """
+        (checked_on, indices) = self.rebuild_indices
+        if checked_on is not None and (
+            time.monotonic() - checked_on < self.rebuild_check_interval
+        ):
+            return indices
+
+        # writes are not failed by errors while no rebuild is known to be in
+        # progress; the indices last fetched continue to be used instead.
+        try:
+            response = self.client.indices.get_alias(name=self.get_rebuild_alias())
+            indices = sorted(response.keys())
+        except exceptions.NotFoundError:
+            indices = []
+        except (exceptions.ApiError, exceptions.TransportError) as exc:
+            msg = "Unable to fetch indices of '{}': {}"
+            logger.warning(msg.format(self.get_rebuild_alias(), exc))
+
+        self.rebuild_indices = (time.monotonic(), indices)
+        return indices
+
+    def is_live_index(self, index=None):
+        """
+        Determines whether index (by default, the live index) is served by
+        the alias of 'get_index'.
+        """
+        if index is None or index == self.get_index():
+            return True
+        return index in self.get_live_indices()
+
+    def get_write_indices(self, index=None):
+        """
+        Returns the names of the indices to which writes are made: the given
+        index or, by default, the live index along with any indices which
+        are being rebuilt (such that writes made during a rebuild are not
+        lost once it is installed).
+        """
+        if index is not None:
+            return [index]
+
+        return [self.get_index()] + self.get_rebuild_indices()
+
+    def create_index(self, index=None):
+        """
+        Creates and configures a new (by default, versioned) index and
+        installs the mapping. Returns the name of the index created.
+
+        The new index does not replace the live index until it is installed
+        using 'swap_index'.
+        """
+        index = self.get_index_version() if index is None else index
 
         logger.debug("Creating index '{}'".format(index))
         self.client.indices.create(index=index)
+        self.configure_index(index)
+
+        mapping = self.get_mapping()
+        log_msg = "Updating mapping for index '{}': {}"
+        logger.debug(log_msg.format(index, mapping))
+        self.client.indices.put_mapping(**mapping, index=index)
 
-    def configure_index(self):
+        return index
+
+    def configure_index(self, index=None):
         """
         Handles configuration of index settings.
 
@@ -321,7 +1059,7 @@ class Search(FieldMappingMixin):
         All other configuration is set after index is closed.
         """
         settings = self.get_settings()
-        index = self.get_index()
+        index = self.get_index() if index is None else index
 
         config = self.get_index_settings()
         index_settings = config.pop("index", {})
@@ -387,31 +1125,204 @@ class Search(FieldMappingMixin):
 
             return True
 
+        # the alias resolves to the mapping of the live index.
         active_mapping = self.client.indices.get_mapping(index=index)
-        document = active_mapping.get(index).get("mappings")
+        document = list(active_mapping.values())[0].get("mappings")
         return validate_properties(
             mapping.get("properties"), document.get("properties")
         )
 
     def put_mapping(self):
         """
-        Initializes a (possibly new) index and installs the given mapping.
+        Installs the mapping on a new, empty index which replaces the live index.
         """
-        self.create_index()
-        self.configure_index()
+        index = self.create_index()
+        self.swap_index(index)
+        self.prune_index_versions()
 
-        mapping = self.get_mapping()
-        index = self.get_index()
+    def swap_index(self, index):
+        """
+        Atomically points the alias given by 'get_index' to the given index.
 
-        log_msg = "Updating mapping for index '{}': {}"
-        logger.debug(log_msg.format(index, mapping))
-        self.client.indices.put_mapping(**mapping, index=index)
+        An index which was installed using the alias' name (i.e., before
+        indices were versioned) is removed by the same request.
+        """
+        alias = self.get_index()
+
+        actions = [
+            {"remove": {"index": live_index, "alias": alias}}
+            for live_index in self.get_live_indices()
+            if live_index != index
+        ]
+        if not self.client.indices.exists_alias(name=alias) and (
+            self.client.indices.exists(index=alias)
+        ):
+            actions.append({"remove_index": {"index": alias}})
+        if index in self.get_rebuild_indices():
+            actions.append(
+                {"remove": {"index": index, "alias": self.get_rebuild_alias()}}
+            )
+        actions.append({"add": {"index": index, "alias": alias}})
+
+        logger.info("Installing index '{}' as '{}'".format(index, alias))
+        self.client.indices.update_aliases(actions=actions)
+        self.rebuild_indices = (None, [])
+
+    def prune_index_versions(self, retain=None):
+        """
+        Deletes versioned indices which are not live, except for the most
+        recent 'retain' (by default, 'index_versions_retained') indices.
+        """
+        retain = self.index_versions_retained if retain is None else retain
+
+        live_indices = self.get_live_indices()
+        versions = [i for i in self.get_index_versions() if i not in live_indices]
+        for index in versions[: max(0, len(versions) - retain)]:
+            logger.info("Deleting index '{}'".format(index))
+            self.client.indices.delete(index=index, ignore_unavailable=True)
+
+    def get_rebuild_checkpoint(self, selection=""):
+        """
+        Returns the checkpoint of the most recent interrupted rebuild of the
+        given selection (see 'get_checkpoint') whose index has been retained,
+        if any. The checkpoints of rebuilds whose indices have since been
+        deleted are discarded.
+        """
+        from .models import IndexCheckpoint
+
+        live_indices = self.get_live_indices()
+        versions = [i for i in self.get_index_versions() if i not in live_indices]
+        checkpoints = IndexCheckpoint.objects.filter(
+            label=self.model._meta.label, index__startswith=self.get_index_version("")
+        )
+        checkpoints.exclude(index__in=versions).delete()
+        checkpoints = checkpoints.filter(index__in=versions, selection=selection)
+        return checkpoints.order_by("-started_on").first()
+
+    def rebuild_index(
+        self, qs, workers=1, checkpoint=False, resume=False, selection=""
+    ):
+        """
+        Builds a new index from the records of qs and then atomically
+        replaces the live index, which remains available until then.
+
+        The new index is filled without replicas or periodic refreshes,
+        which are restored before it is installed.
+
+        Until it is installed, writes to the live index are also made to the
+        new index (see 'get_write_indices'). As other processes notice the
+        rebuild only after 'rebuild_check_interval', the records modified
+        since the rebuild began (the high-water mark) are indexed again by
+        a final catch-up pass. The new index is then reconciled with the
+        records selected by 'get_qs' (see 'reconcile') such that records
+        deleted or no longer selected meanwhile (or, if records are not
+        dated, created meanwhile) are accounted for.
+
+        If 'checkpoint' is given, the progress of the rebuild is recorded
+        (see 'get_checkpoint') and its index is retained if it fails, such
+        that it may be continued by a rebuild of the same 'selection' given
+        'resume'.
+        """
+        index_checkpoint = None
+        if resume:
+            index_checkpoint = self.get_rebuild_checkpoint(selection)
+        if index_checkpoint is not None:
+            index = index_checkpoint.index
+            logger.info("Resuming rebuild of index '{}'".format(index))
+        else:
+            index = self.create_index()
+            if checkpoint or resume:
+                index_checkpoint = self.get_checkpoint(index, selection=selection)
+
+        bulk_settings = {"index": {"number_of_replicas": 0, "refresh_interval": "-1"}}
+        self.client.indices.put_settings(settings=bulk_settings, index=index)
+
+        try:
+            high_water_mark = now()
+            if index_checkpoint is not None:
+                high_water_mark = index_checkpoint.started_on
+
+            self.client.indices.update_aliases(
+                actions=[{"add": {"index": index, "alias": self.get_rebuild_alias()}}]
+            )
+            self.rebuild_indices = (None, [])
+            logger.info("Rebuilding index '{}' from {}".format(index, high_water_mark))
+
+            result = self.bulk_index(
+                qs,
+                workers=workers,
+                refresh="none",
+                index=index,
+                checkpoint=index_checkpoint,
+            )
+            self.catch_up_index(index, high_water_mark, workers)
+
+            # entries are only visible to the reconcile once refreshed.
+            self.client.indices.refresh(index=index)
+            self.reconcile(refresh="none", index=index)
+        except BaseException:
+            self.rebuild_indices = (None, [])
+            if index_checkpoint is not None and index_checkpoint.pk is not None:
+                msg = "Rebuild of index '{}' failed; it may be resumed."
+                logger.error(msg.format(index))
+                self.client.indices.update_aliases(
+                    actions=[
+                        {"remove": {"index": index, "alias": self.get_rebuild_alias()}}
+                    ]
+                )
+                raise
+
+            logger.error("Rebuild of index '{}' failed; discarding it.".format(index))
+            self.client.indices.delete(index=index, ignore_unavailable=True)
+            raise
+
+        index_settings = self.get_index_settings()["index"]
+        restored_settings = {
+            "index": {
+                "number_of_replicas": index_settings.get("number_of_replicas"),
+                "refresh_interval": index_settings.get("refresh_interval"),
+            }
+        }
+        self.client.indices.put_settings(settings=restored_settings, index=index)
+        self.client.indices.refresh(index=index)
+
+        self.swap_index(index)
+        self.prune_index_versions()
+        return result
+
+    def catch_up_index(self, index, since, workers=1):
+        """
+        Indexes the records modified (according to 'date_field') since the
+        given time into index. Returns None if records are not dated.
+        """
+        try:
+            self.model._meta.get_field(self.date_field)
+        except FieldDoesNotExist:
+            msg = "Records of {} are not dated; skipping catch-up of '{}'."
+            logger.warning(msg.format(self.model.__name__, index))
+            return None
+
+        qs = self.get_qs(since=since)
+        logger.info("Catching up {} records of index '{}'".format(qs.count(), index))
+        return self.bulk_index(qs, workers=workers, refresh="none", index=index)
 
     def get_base_qs(self):
         # Some objects have a default ordering, which only slows
         # things down here.
         return self.model.objects.order_by()
 
+    def apply_prefetch_plan(self, qs):
+        """
+        Fetches the related records used to prepare documents along with qs.
+        """
+        (select_related, prefetch_related) = self.get_prefetch_plan()
+        if select_related:
+            qs = qs.select_related(*select_related)
+        if prefetch_related:
+            qs = qs.prefetch_related(*prefetch_related)
+
+        return qs
+
     def get_qs(self, since=None, until=None, limit=None):
         qs = self.get_base_qs()
         filters = {}
@@ -454,15 +1365,44 @@ class Search(FieldMappingMixin):
             msg = "Index entry request for '{}' encountered a connection error."
             logger.warning(msg.format(instance))
 
-    def index_instance(self, instance):
+    def get_refresh_params(self, refresh):
+        """
+        Computes the request parameters corresponding to the given refresh policy.
+        """
+        if refresh not in REFRESH_POLICIES:
+            raise ValueError("Unknown refresh policy '{}'".format(refresh))
+        if refresh in ("wait_for", "true"):
+            return {"refresh": refresh}
+        return {}
+
+    def get_bulk_refresh(self, refresh=None, index=None):
+        """
+        Returns the given refresh policy or, by default, that used for bulk
+        requests to index: 'bulk_refresh' if it is live and 'end' otherwise.
+        """
+        if refresh is not None:
+            return refresh
+        return self.bulk_refresh if self.is_live_index(index) else "end"
+
+    def index_instance(self, instance, refresh=None):
+        refresh = self.refresh if refresh is None else refresh
+        # a single document write concludes at the end of its own request.
+        if refresh == "end":
+            refresh = "true"
+
         if self.get_qs().filter(pk=instance.pk).exists():
             try:
                 logger.debug("Indexing instance '{}'".format(instance))
-                self.client.index(
-                    index=self.get_index(),
-                    id=instance.pk,
-                    body=self.prepare(instance),
-                    params={"refresh": "true"},
+                document = self.get_document(instance)
+                for index in self.get_write_indices():
+                    self.client.index(
+                        index=index,
+                        id=instance.pk,
+                        body=document,
+                        params=self.get_refresh_params(refresh),
+                    )
+                self.set_cached_fingerprint(
+                    instance.pk, document.get(self.fingerprint_field, None)
                 )
             except exceptions.ConnectionTimeout as exc:
                 msg = "Index request for '{}' timed out."
@@ -476,12 +1416,14 @@ class Search(FieldMappingMixin):
                     instance.__class__.__name__, instance.pk
                 )
                 logger.debug("Un-indexing instance {}".format(instance_repr))
-                self.client.delete(
-                    index=self.get_index(),
-                    id=instance.pk,
-                    ignore=404,
-                    params={"refresh": "true"},
-                )
+                self.set_cached_fingerprint(instance.pk, None)
+                for index in self.get_write_indices():
+                    self.client.delete(
+                        index=index,
+                        id=instance.pk,
+                        ignore=404,
+                        params=self.get_refresh_params(refresh),
+                    )
             except exceptions.ConnectionTimeout as exc:
                 msg = "Unindex request for '{}' timed out."
                 logger.warning(msg.format(instance))
@@ -490,167 +1432,610 @@ class Search(FieldMappingMixin):
                 logger.warning(msg.format(instance))
 
     def set_index_refresh(self, index, state):
-        index_settings = {"index": {"refresh_interval": None if state else "-1"}}
+        """
+        Disables or restores the periodic refresh of the given index.
+
+        The 'refresh_interval' given by the connection's 'INDEX_OPTIONS' is
+        restored if configured; otherwise, the Elasticsearch default is used.
+        """
+        interval = "-1"
+        if state:
+            interval = self.get_index_settings()["index"].get("refresh_interval")
+
+        index_settings = {"index": {"refresh_interval": interval}}
         self.client.indices.put_settings(settings=index_settings, index=index)
-        if not state:
-            self.client.indices.forcemerge(index=index)
+
+    @contextmanager
+    def suspended_refresh(self, index=None):
+        """
+        Disables periodic refreshes of the index for the duration of the
+        context and forces a single refresh upon exiting it.
+
+        The periodic refreshes of a live index are left in place, such that
+        its concurrent writes continue to be made visible.
+        """
+        suspended = not self.is_live_index(index)
+        index = self.get_index() if index is None else index
+
+        try:
+            if suspended:
+                self.set_index_refresh(index, False)
+        except (exceptions.TransportError, exceptions.NotFoundError) as exc:
+            msg = "Unable to suspend refresh of index '{}': {}"
+            logger.warning(msg.format(index, exc))
+
+        try:
+            yield
+        finally:
+            try:
+                if suspended:
+                    self.set_index_refresh(index, True)
+                self.client.indices.refresh(index=index)
+            except (exceptions.TransportError, exceptions.NotFoundError) as exc:
+                msg = "Unable to refresh index '{}': {}"
+                logger.warning(msg.format(index, exc))
 
     def get_chunksize(self, queryset):
         chunk_factor = getattr(settings, "ELASTICSEARCH_INDEX_CHUNK_FACTOR", 20)
         return CHUNKSIZE * max(1, int(queryset.count() / (CHUNKSIZE * chunk_factor)))
 
-    def bulk_index(self, qs):
-        index = self.get_index()
+    def get_bulk_options(self):
+        """
+        Computes the options used to submit bulk requests.
+
+        Options given by the connection's 'BULK_OPTIONS' are overridden
+        by those given on this index.
+        """
+        connection_info = settings.ELASTICSEARCH_CONNECTIONS[self.connection]
+        options = dict(connection_info.get("BULK_OPTIONS", {}))
+
+        if self.bulk_thread_count is not None:
+            options["thread_count"] = self.bulk_thread_count
+        if self.bulk_queue_size is not None:
+            options["queue_size"] = self.bulk_queue_size
+
+        return options
+
+    def stream_bulk(
+        self,
+        actions,
+        chunksize=CHUNKSIZE,
+        operation="index",
+        refresh=None,
+        index=None,
+        parallel=False,
+        **kwargs,
+    ):
+        """
+        Submits the given (lazily-evaluated) actions via 'streaming_bulk' or,
+        if 'parallel' is given and so configured, via 'parallel_bulk' using a
+        bounded pool of threads. Actions issued while saving records (e.g.,
+        within a transaction) are thus submitted by the calling thread.
+
+        Requests are bounded by both 'chunksize' actions and 'max_chunk_bytes'
+        and are made visible according to the given refresh policy (applied
+        to the live index or, if given, to 'index').
+        Returns a tuple giving the number of successful and failed items; a
+        request which fails to complete is counted as a single failed item.
+        """
+        refresh = self.get_bulk_refresh(refresh, index)
+        if refresh == "end":
+            with self.suspended_refresh(index):
+                return self.stream_bulk(
+                    actions,
+                    chunksize,
+                    operation,
+                    refresh="none",
+                    parallel=parallel,
+                    **kwargs,
+                )
+
+        kwargs.update(self.get_refresh_params(refresh))
+        (success, failed) = (0, 0)
+
+        options = self.get_bulk_options() if parallel else {}
+        if options.get("thread_count", 1) > 1:
+            logger.debug("Using parallel bulk request options: {}".format(options))
+            # actions are consumed by the pool's task handler thread.
+            (helper, actions) = (parallel_bulk, close_connections(actions))
+            kwargs.update(options)
+        else:
+            helper = streaming_bulk
+
+        try:
+            for ok, item in helper(
+                client=self.client,
+                actions=actions,
+                chunk_size=chunksize,
+                max_chunk_bytes=self.max_chunk_bytes,
+                raise_on_error=False,
+                raise_on_exception=False,
+                **kwargs,
+            ):
+                if ok:
+                    success += 1
+                    continue
+
+                failed += 1
+                logger.error("Failure during bulk {}: {}".format(operation, item))
+        except exceptions.ConnectionTimeout as exc:
+            failed += 1
+            logger.warning("Bulk {} request timed out.".format(operation))
+        except exceptions.ConnectionError as exc:
+            failed += 1
+            msg = "Bulk {} request encountered a connection error."
+            logger.warning(msg.format(operation))
+
+        log_msg = "Bulk {} request completed: {} succeeded, {} failed."
+        logger.info(log_msg.format(operation, success, failed))
+        return (success, failed)
+
+    def iterate_changed(self, instances):
+        """
+        Lazily filters instances to those whose index entries have changed,
+        yielding (instance, document) pairs (see 'get_changed_documents').
+        """
+        for chunk in iterate_chunks(instances, CHUNKSIZE):
+            yield from self.get_changed_documents(chunk)
+
+    def get_index_actions(self, instance, indices, document=None):
+        """
+        Returns the bulk actions which index instance (as the given document
+        or, by default, as that given by 'get_document') into each of indices.
+
+        The cached fingerprint of instance is discarded: bulk requests do not
+        report which documents were written and so the fingerprints of their
+        documents are fetched again when next required.
+        """
+        self.set_cached_fingerprint(instance.pk, None)
+        if document is None:
+            document = self.get_document(instance)
+        return [
+            {"_index": index, "_id": instance.pk, "_source": document}
+            for index in indices
+        ]
+
+    def get_delete_actions(self, pk, indices):
+        """
+        Returns the bulk actions which remove the entry of pk from each of indices.
+        """
+        return [{"_index": index, "_op_type": "delete", "_id": pk} for index in indices]
+
+    def get_checkpoint(self, index=None, resume=False, selection=""):
+        """
+        Returns the checkpoint of the bulk index of this model into index (by
+        default, the live index). Unless 'resume' is given, any progress
+        recorded by a previous bulk index is discarded.
+
+        The given selection identifies the records being indexed (e.g., by
+        the filters given to a management command), such that only a bulk
+        index of the same records resumes its progress.
+        """
+        from .models import IndexCheckpoint
+
+        index = self.get_index() if index is None else index
+        (checkpoint, created) = IndexCheckpoint.objects.get_or_create(
+            label=self.model._meta.label, index=index, selection=selection
+        )
+        if not created and not resume:
+            (checkpoint.last_pk, checkpoint.started_on) = ("", now())
+            checkpoint.save()
+
+        return checkpoint
+
+    def get_checkpoint_pk(self, checkpoint):
+        """
+        Returns the last primary key completed according to checkpoint, if any.
+        """
+        if not checkpoint.last_pk:
+            return None
+
+        return self.model._meta.pk.to_python(checkpoint.last_pk)
+
+    def save_checkpoint(self, checkpoint, pk):
+        checkpoint.last_pk = str(pk)
+        checkpoint.save(update_fields=["last_pk", "updated_on"])
+
+    def bulk_index(
+        self,
+        qs,
+        workers=1,
+        refresh=None,
+        changed_only=False,
+        index=None,
+        checkpoint=None,
+    ):
+        """
+        Indexes the records of qs into the indices given by 'get_write_indices'
+        or, if given, into the (e.g., versioned) index given by 'index'.
+
+        If 'changed_only' is given, only those records whose index entries
+        have changed (see 'get_changed_instances') are submitted.
+
+        If a checkpoint is given (see 'get_checkpoint'), records are indexed
+        in order of primary key starting after the last primary key it
+        records, and it is advanced as chunks of records are completed. The
+        checkpoint is deleted once all records have been indexed without
+        failure.
+        """
+        if checkpoint is not None and qs.query.is_sliced:
+            logger.warning("Bulk index of a sliced queryset cannot be checkpointed.")
+            checkpoint.delete()
+            checkpoint = None
+
+        if checkpoint is not None:
+            last_pk = self.get_checkpoint_pk(checkpoint)
+            if last_pk is not None:
+                msg = "Resuming bulk index of {} after primary key '{}'"
+                logger.info(msg.format(self.model.__name__, last_pk))
+                qs = qs.filter(pk__gt=last_pk)
 
         if not qs.exists():
             logger.info("Bulk index request received for empty queryset. Skipping.")
+            if checkpoint is not None:
+                checkpoint.delete()
             return None
 
-        try:
-            assert qs.count() > CHUNKSIZE, "Falling back to non-chunked indexing."
+        if workers > 1 and not qs.query.is_sliced:
+            return self.bulk_index_parallel(
+                qs,
+                workers,
+                refresh=refresh,
+                changed_only=changed_only,
+                index=index,
+                checkpoint=checkpoint,
+            )
 
-            chunksize = self.get_chunksize(qs)
-            logger.info("Using chunk size of '{}'".format(chunksize))
+        # related records are fetched once per chunk of records.
+        qs = self.apply_prefetch_plan(qs)
+        if checkpoint is not None:
+            return self.bulk_index_checkpointed(
+                qs, checkpoint, refresh=refresh, changed_only=changed_only, index=index
+            )
 
-            responses = []
-            for chunk in queryset_iterator(qs, chunksize=chunksize):
-                try:
-                    actions = [
-                        {
-                            "_index": index,
-                            "_id": instance.pk,
-                            "_source": self.prepare(instance),
-                        }
-                        for instance in chunk.iterator()
-                    ]
-                    responses.append(
-                        bulk(
-                            client=self.client,
-                            actions=tuple(actions),
-                            params={"refresh": "true"},
-                        )
-                    )
-                except BulkIndexError as e:
-                    logger.error("Failure during bulk index: {}".format(e))
-                except exceptions.ConnectionTimeout as exc:
-                    logger.warning("Bulk index request timed out.")
-                except exceptions.ConnectionError as exc:
-                    logger.warning("Bulk index request encountered a connection error.")
+        chunksize = self.get_chunksize(qs)
+        logger.info("Using chunk size of '{}'".format(chunksize))
 
-            return responses
+        instances = queryset_iterator(qs, chunksize=chunksize)
+        documents = ((instance, None) for instance in instances)
+        if changed_only:
+            documents = self.iterate_changed(instances)
 
-        except AssertionError:
-            try:
-                actions = [
-                    {
-                        "_index": index,
-                        "_id": instance.pk,
-                        "_source": self.prepare(instance),
-                    }
-                    for instance in qs.iterator()
-                ]
-                return bulk(
-                    client=self.client,
-                    actions=tuple(actions),
-                    params={"refresh": "true"},
+        indices = self.get_write_indices(index)
+        actions = itertools.chain.from_iterable(
+            self.get_index_actions(instance, indices, document)
+            for (instance, document) in documents
+        )
+        return self.stream_bulk(
+            actions, chunksize=chunksize, refresh=refresh, index=index, parallel=True
+        )
+
+    def bulk_index_checkpointed(
+        self, qs, checkpoint, refresh=None, changed_only=False, index=None
+    ):
+        """
+        Indexes qs in order of primary key using a bulk request per chunk of
+        records, advancing checkpoint as each chunk is completed.
+
+        The checkpoint is not advanced past a chunk which fails (in part),
+        such that resuming the bulk index retries it. The prefetch plan is
+        expected to have been applied to qs (see 'bulk_index').
+        """
+        refresh = self.get_bulk_refresh(refresh, index)
+        if refresh == "end":
+            with self.suspended_refresh(index):
+                return self.bulk_index_checkpointed(
+                    qs, checkpoint, "none", changed_only=changed_only, index=index
                 )
-            except BulkIndexError as e:
-                logger.error("Failure during bulk index: {}".format(e))
-            except exceptions.ConnectionTimeout as exc:
-                logger.warning("Bulk index request timed out.")
-            except exceptions.ConnectionError as exc:
-                logger.warning("Bulk index request encountered a connection error.")
 
-    def bulk_clear(self):
-        index = self.get_index()
+        chunksize = self.get_chunksize(qs)
+        logger.info("Using chunk size of '{}'".format(chunksize))
 
-        try:
-            actions = [
-                {"_index": index, "_op_type": "delete", "_id": hit.pk}
-                for hit in self.get_search()
-            ]
-            log_msg = "Removing all {} instances from {})."
-            logger.debug(log_msg.format(len(actions), index))
-            return bulk(
-                client=self.client,
-                actions=tuple(actions),
-                ignore=404,
-                params={"refresh": "true"},
+        indices = self.get_write_indices(index)
+        instances = queryset_iterator(qs, chunksize=chunksize, ordering=["pk"])
+
+        (success, failed) = (0, 0)
+        for chunk in iterate_chunks(instances, chunksize):
+            last_pk = chunk[-1].pk
+            documents = [(instance, None) for instance in chunk]
+            if changed_only:
+                documents = self.get_changed_documents(chunk)
+
+            actions = itertools.chain.from_iterable(
+                self.get_index_actions(instance, indices, document)
+                for (instance, document) in documents
             )
-        except BulkIndexError as e:
-            logger.error("Failure during bulk clear: {}".format(e))
-        except exceptions.ConnectionTimeout as exc:
-            msg = "Bulk clear request timed out."
-            logger.warning(msg.format(instance))
-        except exceptions.ConnectionError as exc:
-            msg = "Bulk clear request encountered a connection error."
-            logger.warning(msg.format(instance))
+            (chunk_success, chunk_failed) = self.stream_bulk(
+                actions,
+                chunksize=chunksize,
+                refresh=refresh,
+                index=index,
+                parallel=True,
+            )
+            success += chunk_success
+            failed += chunk_failed
+            if not failed:
+                self.save_checkpoint(checkpoint, last_pk)
+
+        if not failed:
+            checkpoint.delete()
+        return (success, failed)
+
+    def bulk_index_parallel(
+        self, qs, workers, refresh=None, changed_only=False, index=None, checkpoint=None
+    ):
+        """
+        Indexes qs using a pool of worker processes, each of which prepares
+        and submits the records of a distinct range of primary keys.
 
-    def bulk_prune(self):
-        index = self.get_index()
+        If a checkpoint is given, it is advanced past each range of primary
+        keys once it and all preceding ranges have been completed.
 
-        pruned = self.model.objects.difference(self.get_qs())
-        qs = self.model.objects.filter(pk__in=pruned.values_list("pk", flat=True))
+        The records of a partition whose worker raises an exception are
+        counted as failed.
 
-        if not qs.exists():
-            logger.info("Bulk prune request has no objects to remove. Skipping.")
+        Returns a tuple giving the aggregate number of successful and failed items.
+        """
+        refresh = self.get_bulk_refresh(refresh, index)
+        if refresh == "end":
+            with self.suspended_refresh(index):
+                return self.bulk_index_parallel(
+                    qs,
+                    workers,
+                    refresh="none",
+                    changed_only=changed_only,
+                    index=index,
+                    checkpoint=checkpoint,
+                )
+
+        label = self.model._meta.label
+        pk_ranges = get_pk_ranges(qs, workers)
+        logger.info(
+            "Indexing {} partitions using {} workers".format(len(pk_ranges), workers)
+        )
+
+        # worker processes must not share the connections of this process
+        connections.close_all()
+
+        (success, failed) = (0, 0)
+        (completed_ranges, next_range) = (set(), 0)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            futures = dict(
+                (
+                    pool.submit(
+                        bulk_index_partition,
+                        label,
+                        qs.query,
+                        pk_range,
+                        refresh,
+                        changed_only,
+                        index,
+                    ),
+                    pk_range,
+                )
+                for pk_range in pk_ranges
+            )
+            for completed, future in enumerate(as_completed(futures), start=1):
+                crashed = False
+                try:
+                    (partition_success, partition_failed) = future.result()
+                except Exception as exc:
+                    crashed = True
+                    msg = "Failure during bulk index of partition {}: {}"
+                    logger.error(msg.format(futures[future], exc))
+
+                    # all records of a failed partition are counted as failed
+                    partition_success = 0
+                    partition_failed = filter_pk_range(qs, futures[future]).count()
+
+                success += partition_success
+                failed += partition_failed
+
+                log_msg = "Completed {} of {} partitions: {} succeeded, {} failed."
+                logger.info(log_msg.format(completed, len(futures), success, failed))
+
+                if checkpoint is None or partition_failed or crashed:
+                    continue
+
+                completed_ranges.add(futures[future])
+                last_range = next_range
+                while (
+                    next_range < len(pk_ranges)
+                    and pk_ranges[next_range] in completed_ranges
+                ):
+                    next_range += 1
+
+                if next_range == last_range:
+                    continue
+
+                (lower, upper) = pk_ranges[next_range - 1]
+                if upper is not None:
+                    last_pk = qs.filter(pk__lt=upper).aggregate(pk=models.Max("pk"))
+                    self.save_checkpoint(checkpoint, last_pk["pk"])
+
+        if checkpoint is not None and next_range == len(pk_ranges):
+            checkpoint.delete()
+        return (success, failed)
+
+    def bulk_update(self, pks, refresh=None):
+        """
+        Synchronizes the index entries of the records with the given primary
+        keys using a single bulk request.
+
+        Records selected by 'get_qs' are indexed if their entries have changed
+        and the entries of all other records are removed.
+        """
+        index = self.get_index()
+        indices = self.get_write_indices()
+        refresh = self.refresh if refresh is None else refresh
+
+        pks = set(pks)
+        if not pks:
             return None
 
-        try:
-            assert qs.count() > CHUNKSIZE, "Falling back to non-chunked indexing."
+        qs = self.apply_prefetch_plan(self.get_qs().filter(pk__in=pks))
+        instances = list(qs)
+        removed = pks - set(instance.pk for instance in instances)
+        for pk in removed:
+            self.set_cached_fingerprint(pk, None)
+
+        logger.debug(
+            "Updating {} and removing {} entries of {}.".format(
+                len(instances), len(removed), index
+            )
+        )
+        actions = itertools.chain(
+            itertools.chain.from_iterable(
+                self.get_index_actions(instance, indices, document)
+                for (instance, document) in self.iterate_changed(instances)
+            ),
+            itertools.chain.from_iterable(
+                self.get_delete_actions(pk, indices) for pk in removed
+            ),
+        )
+        return self.stream_bulk(
+            actions, operation="update", refresh=refresh, ignore_status=404
+        )
 
-            chunksize = self.get_chunksize(qs)
-            logger.info("Using chunk size of '{}'".format(chunksize))
+    def bulk_clear(
+        self,
+        refresh=None,
+        query=None,
+        recreate=False,
+        wait_for_completion=False,
+        poll_interval=1,
+    ):
+        """
+        Removes the entries matching query (by default, all entries) from
+        the indices given by 'get_write_indices'.
 
-            responses = []
-            for chunk in queryset_iterator(qs, chunksize=chunksize):
-                try:
-                    actions = [
-                        {"_index": index, "_op_type": "delete", "_id": instance.pk}
-                        for instance in chunk.iterator()
-                    ]
-                    responses.append(
-                        bulk(
-                            client=self.client,
-                            actions=tuple(actions),
-                            ignore=404,
-                            params={"refresh": "true"},
-                        )
-                    )
-                except BulkIndexError as e:
-                    logger.warning("Failure during bulk prune: {}".format(e))
-                except exceptions.ConnectionTimeout as exc:
-                    msg = "Bulk prune request timed out."
-                    logger.warning(msg.format(instance))
-                except exceptions.ConnectionError as exc:
-                    msg = "Bulk prune request encountered a connection error."
-                    logger.warning(msg.format(instance))
-
-            return responses
-        except AssertionError:
-            try:
-                actions = [
-                    {
-                        "_index": index,
-                        "_id": instance.pk,
-                        "_source": self.prepare(instance),
-                    }
-                    for instance in qs.iterator()
-                ]
-                return bulk(
-                    client=self.client,
-                    actions=tuple(actions),
-                    ignore=404,
-                    params={"refresh": "true"},
-                )
-            except BulkIndexError as e:
-                logger.warning("Failure during bulk prune: {}".format(e))
-            except exceptions.ConnectionTimeout as exc:
-                msg = "Bulk prune request timed out."
-                logger.warning(msg.format(instance))
-            except exceptions.ConnectionError as exc:
-                msg = "Bulk prune request encountered a connection error."
-                logger.warning(msg.format(instance))
+        Entries are removed by a sliced 'delete_by_query' task, which is
+        polled every 'poll_interval' seconds until it has completed or, if
+        'wait_for_completion' is given (e.g., for small indices), by a
+        request which returns once it has completed. If 'recreate' is given,
+        a fresh, empty index replaces the live index instead (see
+        'put_mapping').
+
+        Returns a tuple giving the number of removed and failed entries.
+        """
+        refresh = self.bulk_refresh if refresh is None else refresh
+        if refresh not in REFRESH_POLICIES:
+            raise ValueError("Unknown refresh policy '{}'".format(refresh))
+
+        self.clear_fingerprint_cache()
+        if recreate:
+            logger.info("Replacing {} with an empty index.".format(self.get_index()))
+            self.put_mapping()
+            return (0, 0)
+
+        indices = self.get_write_indices()
+        logger.debug("Removing all instances from {}.".format(", ".join(indices)))
+        response = self.client.delete_by_query(
+            index=indices,
+            query=query or {"match_all": {}},
+            slices="auto",
+            conflicts="proceed",
+            refresh=refresh != "none",
+            wait_for_completion=wait_for_completion,
+        )
+        if wait_for_completion:
+            task = {"response": response.body}
+        else:
+            task = self.wait_for_task(response["task"], poll_interval)
+
+        result = task.get("response", {})
+        (removed, failed) = (result.get("deleted", 0), len(result.get("failures", [])))
+        if "error" in task:
+            failed += 1
+            logger.error("Failure during clear: {}".format(task["error"]))
+
+        log_msg = "Clear request completed: {} removed, {} failed."
+        logger.info(log_msg.format(removed, failed))
+        return (removed, failed)
+
+    def wait_for_task(self, task_id, poll_interval=1):
+        """
+        Polls the given task every poll_interval seconds until it has
+        completed and returns its final status.
+        """
+        while True:
+            task = self.client.tasks.get(task_id=task_id)
+            if task.get("completed"):
+                return task
+
+            logger.debug("Waiting for task '{}'".format(task_id))
+            time.sleep(poll_interval)
+
+    def bulk_prune(self, refresh=None):
+        """
+        Removes the index entries of records which are not selected by
+        'get_qs' and indexes those records which lack an entry (see 'reconcile').
+        """
+        return self.reconcile(refresh=refresh)
+
+    def iterate_index_pks(self, index=None, chunksize=CHUNKSIZE, keep_alive="5m"):
+        """
+        Lazily iterates over the primary keys of the entries of index (by
+        default, the live index) in ascending order (see 'iterate'), such
+        that concurrent writes to the index do not affect the iteration.
+        """
+        pk_field = self.model._meta.pk
+        hits = self.iterate(
+            self.get_search().source(False),
+            sort=[{"pk": "asc"}],
+            page_size=chunksize,
+            keep_alive=keep_alive,
+            index=index,
+            raw=True,
+        )
+        with closing(hits):
+            yield from (pk_field.to_python(hit["_id"]) for hit in hits)
+
+    def get_reconcile_actions(self, diff, indices):
+        """
+        Returns the bulk actions which resolve the given (pk, side) pairs of
+        'diff_sorted': records lacking an entry are indexed and entries
+        lacking a record are removed.
+        """
+        missing = [pk for (pk, side) in diff if side == "left"]
+        orphans = [pk for (pk, side) in diff if side == "right"]
+
+        actions = []
+        for pk in orphans:
+            self.set_cached_fingerprint(pk, None)
+            actions.extend(self.get_delete_actions(pk, indices))
+        if missing:
+            qs = self.apply_prefetch_plan(self.get_qs().filter(pk__in=missing))
+            for instance in qs:
+                actions.extend(self.get_index_actions(instance, indices))
+
+        return actions
+
+    def reconcile(self, refresh=None, index=None):
+        """
+        Reconciles the entries of index (by default, the live index) with the
+        records selected by 'get_qs'.
+
+        The primary keys of the records and of the entries are streamed in
+        ascending order and merge-joined in constant memory: entries whose
+        records no longer exist (or are no longer selected) are removed and
+        records which lack an entry are indexed.
+        """
+        indices = self.get_write_indices(index)
+        logger.info("Reconciling {} with {}".format(indices[0], self.model.__name__))
+
+        diff = diff_sorted(iterate_pks(self.get_qs()), self.iterate_index_pks(index))
+        actions = itertools.chain.from_iterable(
+            self.get_reconcile_actions(chunk, indices)
+            for chunk in iterate_chunks(diff, CHUNKSIZE)
+        )
+        return self.stream_bulk(
+            actions,
+            operation="reconcile",
+            refresh=refresh,
+            index=index,
+            ignore_status=404,
+        )
 
 
 class SearchDescriptor:
@@ -664,7 +2049,7 @@ class SearchDescriptor:
 class SearchMixin:
     @classmethod
     def _search_meta(cls):
-        return getattr(cls, "Search")(model=cls)
+        return get_search_meta(cls)
 
     def index(self):
         return self._search_meta().index_instance(self)
@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
+import logging
 import re
 
 from django.core.management.base import BaseCommand, CommandError
 from inelastic_models.receivers import get_search_models
 
+logger = logging.getLogger(__name__)
+
 DURATION_RE = re.compile(
     r"^(?:(?P<days>\d+)D)?"
     r"(?:(?P<hours>\d+)H)?"
@@ -37,6 +40,21 @@ class IndexCommand(BaseCommand):
             dest="limit",
             help="Index at most this many of each model.",
         )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            default=1,
+            type=int,
+            dest="workers",
+            help="Prepare and submit records using this many worker processes.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            default=False,
+            dest="resume",
+            help="Resume an interrupted run from its last checkpoint.",
+        )
 
     def parse_date_time(self, timestamp):
         try:
@@ -72,6 +90,25 @@ class IndexCommand(BaseCommand):
 
         return models
 
+    def log_result(self, search, result):
+        if result is None:
+            return
+
+        (success, failed) = result
+        log_msg = "Indexed {} {} objects ({} failed)"
+        logger.info(log_msg.format(success, search.model.__name__, failed))
+
+    def get_selection(self, options):
+        """
+        Identifies the records selected by the given options, such that only
+        a run given the same options resumes the checkpoint of another.
+        """
+        return " ".join(
+            "--{}={}".format(name, options[name])
+            for name in ("since", "until")
+            if options[name]
+        )
+
     def handle_operation(self, search, queryset):
         raise NotImplementedError
 
@@ -84,11 +121,19 @@ class IndexCommand(BaseCommand):
         if options["since"]:
             since = self.parse_date_time(options["since"])
 
+        until = None
+        if options["until"]:
+            until = self.parse_date_time(options["until"])
+
         limit = None
         if options["limit"]:
             limit = int(options["limit"])
 
+        self.workers = max(1, options["workers"])
+        self.resume = options["resume"]
+        self.selection = self.get_selection(options)
+
         for model in models:
             search = model._search_meta()
-            queryset = search.get_qs(since=since, limit=limit)
+            queryset = search.get_qs(since=since, until=until, limit=limit)
             self.handle_operation(search, queryset)
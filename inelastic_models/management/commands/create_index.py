@@ -10,14 +10,20 @@ class Command(IndexCommand):
     TBD
     """
 
-    help = "Creates and populates the search index.  If it already exists, it is deleted first."
+    help = "Creates and populates a new version of the search index, which then replaces the existing index."
 
     def handle_operation(self, search, queryset):
         index = search.get_index()
         logger.info("Creating mapping {} for {}".format(index, search.model.__name__))
-        search.put_mapping()
 
         logger.info(
             "Indexing {} {} objects".format(queryset.count(), search.model.__name__)
         )
-        search.bulk_index(queryset)
+        result = search.rebuild_index(
+            queryset,
+            workers=self.workers,
+            checkpoint=True,
+            resume=self.resume,
+            selection=self.selection,
+        )
+        self.log_result(search, result)
@@ -10,7 +10,7 @@ class Command(IndexCommand):
     TBD
     """
 
-    help = "Updates the index mapping, if necessary. This operation destroys the existing index."
+    help = "Updates the index mapping, if necessary, by rebuilding the index. The existing index remains available until it is replaced."
 
     def handle_operation(self, search, queryset):
         index = search.get_index()
@@ -19,7 +19,11 @@ class Command(IndexCommand):
             return
 
         logger.info("Migrating new or existing mapping '{}'...".format(index))
-        search.put_mapping()
-
-        logger.info("(Re-)Indexing mapping '{}'...".format(index))
-        search.bulk_index(queryset)
+        result = search.rebuild_index(
+            queryset,
+            workers=self.workers,
+            checkpoint=True,
+            resume=self.resume,
+            selection=self.selection,
+        )
+        self.log_result(search, result)
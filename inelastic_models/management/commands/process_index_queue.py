@@ -0,0 +1,105 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from inelastic_models.backends import QueueBackend
+from inelastic_models.receivers import load_backend
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Processes the index updates queued by 'backends.QueueBackend'.
+    """
+
+    help = "Processes pending index updates in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            default=None,
+            type=int,
+            dest="batch_size",
+            help="Process at most this many updates per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            default=False,
+            dest="loop",
+            help="Continue to process updates as they are queued.",
+        )
+        parser.add_argument(
+            "--interval",
+            action="store",
+            default=5.0,
+            type=float,
+            dest="interval",
+            help="Wait this many seconds for updates to be queued (with --loop).",
+        )
+        failed = parser.add_mutually_exclusive_group()
+        failed.add_argument(
+            "--list-failed",
+            action="store_true",
+            default=False,
+            dest="list_failed",
+            help="List the updates abandoned after repeated failures and exit.",
+        )
+        failed.add_argument(
+            "--retry-failed",
+            action="store_true",
+            default=False,
+            dest="retry_failed",
+            help="Requeue the updates abandoned after repeated failures and exit.",
+        )
+        failed.add_argument(
+            "--purge-failed",
+            action="store_true",
+            default=False,
+            dest="purge_failed",
+            help="Delete the updates abandoned after repeated failures and exit.",
+        )
+
+    def get_backend(self):
+        backend_path = getattr(settings, "ELASTICSEARCH_INDEX_BACKEND", None)
+        if backend_path is not None:
+            backend = load_backend(backend_path)
+            if isinstance(backend, QueueBackend):
+                return backend
+
+        return QueueBackend()
+
+    def handle_failed(self, backend, **options):
+        if options["list_failed"]:
+            for update in backend.get_failed().order_by("queued_on", "pk"):
+                self.stdout.write(
+                    "{} ({} attempts): {}".format(
+                        update, update.attempts, update.last_error
+                    )
+                )
+        elif options["retry_failed"]:
+            count = backend.retry_failed()
+            logger.info("Requeued {} failed index updates".format(count))
+        elif options["purge_failed"]:
+            count = backend.purge_failed()
+            logger.info("Purged {} failed index updates".format(count))
+
+    def handle(self, *args, **options):
+        backend = self.get_backend()
+
+        if options["list_failed"] or options["retry_failed"] or options["purge_failed"]:
+            return self.handle_failed(backend, **options)
+
+        while True:
+            (processed, failed) = backend.drain(limit=options["batch_size"])
+            if processed:
+                log_msg = "Processed {} index updates ({} failed)"
+                logger.info(log_msg.format(processed, failed))
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -10,8 +10,9 @@ class Command(IndexCommand):
     TBD
     """
 
-    help = "Prunes the search index to synchronize it with the corresponding data model store."
+    help = "Reconciles the search index with the corresponding data model store, removing stale entries and indexing missing records."
 
     def handle_operation(self, search, queryset):
-        logger.info("Pruning {} objects".format(search.model.__name__))
-        search.bulk_prune()
+        logger.info("Reconciling {} objects".format(search.model.__name__))
+        result = search.reconcile()
+        self.log_result(search, result)
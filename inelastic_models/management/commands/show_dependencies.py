@@ -0,0 +1,53 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from inelastic_models.receivers import get_dependency_graph
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Describes the graph of dependencies between indexed models.
+    """
+
+    help = "Shows the dependencies between indexed models in the order in which they are dispatched."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dot",
+            action="store_true",
+            default=False,
+            dest="dot",
+            help="Describe the graph using the Graphviz DOT language.",
+        )
+
+    def handle_dot(self, graph):
+        self.stdout.write("digraph dependencies {")
+        for model in graph.order:
+            self.stdout.write('  "{}";'.format(graph.get_label(model)))
+            for dependent, select_param in graph.get_dependents(model):
+                self.stdout.write(
+                    '  "{}" -> "{}" [label="{}"];'.format(
+                        graph.get_label(model), graph.get_label(dependent), select_param
+                    )
+                )
+        self.stdout.write("}")
+
+    def handle(self, *args, **options):
+        graph = get_dependency_graph()
+        if options["dot"]:
+            return self.handle_dot(graph)
+
+        for position, model in enumerate(graph.order, start=1):
+            self.stdout.write("{}. {}".format(position, graph.get_label(model)))
+            for dependent, select_param in graph.get_dependents(model):
+                self.stdout.write(
+                    "   -> {} (via '{}')".format(
+                        graph.get_label(dependent), select_param
+                    )
+                )
+
+        for cycle in graph.cycles:
+            self.stdout.write("Cycle: {}".format(graph.describe_cycle(cycle)))
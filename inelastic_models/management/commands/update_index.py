@@ -12,8 +12,42 @@ class Command(IndexCommand):
 
     help = "Updates the search index to synchronize it with the corresponding data model store."
 
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            dest="force",
+            help="Index all objects, including those whose index entries have not changed.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            action="store_true",
+            default=False,
+            dest="checkpoint",
+            help="Record the progress of this run such that it can be resumed (see --resume).",
+        )
+
+    def handle(self, *args, **options):
+        self.force = options["force"]
+        self.checkpoint = options["checkpoint"] or options["resume"]
+        return super().handle(*args, **options)
+
     def handle_operation(self, search, queryset):
         logger.info(
             "Indexing {} {} objects".format(queryset.count(), search.model.__name__)
         )
-        search.bulk_index(queryset)
+        checkpoint = None
+        if self.checkpoint:
+            checkpoint = search.get_checkpoint(
+                resume=self.resume, selection=self.selection
+            )
+
+        result = search.bulk_index(
+            queryset,
+            workers=self.workers,
+            changed_only=not self.force,
+            checkpoint=checkpoint,
+        )
+        self.log_result(search, result)
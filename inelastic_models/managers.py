@@ -0,0 +1,70 @@
+import logging
+
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+
+class SearchQuerySetMixin:
+    """
+    Dispatches index updates of the records affected by bulk operations
+    which do not send 'post_save' signals: 'update', 'bulk_create' and
+    'bulk_update'.
+
+    Only the affected records (and their dependents) are updated.
+    """
+
+    def is_tracked(self):
+        from .receivers import is_tracked
+
+        return is_tracked(self.model)
+
+    def handle_records(self, pks):
+        from .receivers import handle_records
+
+        handle_records(self.model, pks, using=self.db)
+
+    def update(self, **kwargs):
+        if not self.is_tracked():
+            return super().update(**kwargs)
+
+        # records are selected before they are updated as the update may
+        # change whether or not they match the filters of this queryset.
+        pks = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        self.handle_records(pks)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if len(pks) < len(objs):
+            logger.warning(
+                "Unable to update index entries of {} created {} records".format(
+                    len(objs) - len(pks), self.model._meta.verbose_name
+                )
+            )
+
+        self.handle_records(pks)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, *args, **kwargs):
+        objs = list(objs)
+        rows = super().bulk_update(objs, *args, **kwargs)
+        self.handle_records(obj.pk for obj in objs)
+        return rows
+
+    bulk_update.alters_data = True
+
+
+class SearchQuerySet(SearchQuerySetMixin, models.QuerySet):
+    pass
+
+
+class SearchManager(models.Manager.from_queryset(SearchQuerySet)):
+    pass
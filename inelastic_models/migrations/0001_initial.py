@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexUpdate",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        verbose_name="ID",
+                        serialize=False,
+                        auto_created=True,
+                        primary_key=True,
+                    ),
+                ),
+                ("label", models.CharField(max_length=255)),
+                ("object_id", models.CharField(max_length=255)),
+                (
+                    "queued_on",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "available_on",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, db_index=True
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="indexupdate",
+            constraint=models.UniqueConstraint(
+                fields=("label", "object_id"), name="unique_index_update"
+            ),
+        ),
+    ]
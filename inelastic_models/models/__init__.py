@@ -0,0 +1,2 @@
+from .queue import IndexUpdate
+from .checkpoint import IndexCheckpoint
@@ -0,0 +1,32 @@
+from django.utils.timezone import now
+from django.db import models
+
+
+class IndexCheckpoint(models.Model):
+    """
+    The progress of a bulk index of the records of a model into an index.
+
+    Records are indexed in order of primary key such that an interrupted
+    bulk index may be resumed after the last completed primary key. Bulk
+    indices of different selections of records (e.g., given by the filters
+    of a management command) are checkpointed separately.
+    """
+
+    label = models.CharField(max_length=255)
+    index = models.CharField(max_length=255)
+    selection = models.CharField(max_length=255, blank=True)
+    last_pk = models.CharField(max_length=255, blank=True)
+    started_on = models.DateTimeField(default=now)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "{} ({}): {}".format(self.label, self.index, self.last_pk)
+
+    class Meta:
+        app_label = "inelastic_models"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["label", "index", "selection"],
+                name="unique_index_checkpoint",
+            )
+        ]
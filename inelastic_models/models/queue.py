@@ -0,0 +1,29 @@
+from django.utils.timezone import now
+from django.db import models
+
+
+class IndexUpdate(models.Model):
+    """
+    A pending update of the index entry of a single record.
+
+    Updates are unique per record such that repeated updates of the same
+    record are coalesced until they have been processed.
+    """
+
+    label = models.CharField(max_length=255)
+    object_id = models.CharField(max_length=255)
+    queued_on = models.DateTimeField(default=now)
+    available_on = models.DateTimeField(default=now, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return "{} ({})".format(self.label, self.object_id)
+
+    class Meta:
+        app_label = "inelastic_models"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["label", "object_id"], name="unique_index_update"
+            )
+        ]
@@ -1,21 +1,25 @@
 import collections
 import functools
 import importlib
+import threading
 import logging
 
 from contextlib import contextmanager
-from datetime import timedelta
 
-from django.utils.timezone import now
 from django.dispatch import receiver
 from django.db.models import signals
+from django.db import router, transaction
 from django.conf import settings
 from django.apps import apps
 
-from .indexes import SearchMixin
-from .utils import merge
+from .dependencies import DependencyGraph
+from .indexes import SearchMixin, Search, CHUNKSIZE
+from .utils import merge, iterate_chunks
 
+# The (models, records) of active 'suspended_updates' contexts, where records
+# are the primary keys of the suppressed updates of each model.
 SUSPENDED_MODELS = []
+DEFERRED_UPDATES = threading.local()
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +65,36 @@ def get_reverse_dependencies():
     return reverse_dependencies
 
 
+@functools.lru_cache()
+def get_dependency_graph():
+    """
+    Compiles the graph of dependencies between indexed models. The graph is
+    compiled once all apps are ready (see 'apps.SearchConfig').
+    """
+    graph = DependencyGraph(get_reverse_dependencies(), apps.get_models())
+    for cycle in graph.cycles:
+        logger.warning(
+            "Found cyclic index dependencies: {}".format(graph.describe_cycle(cycle))
+        )
+
+    return graph
+
+
+@receiver(signals.class_prepared)
+def handle_class_prepared(sender, **kwargs):
+    """
+    Discards the compiled dependency graph once an indexed model is defined
+    after apps are ready (e.g., a model defined by tests) such that it is
+    compiled again, including the model, when next used.
+    """
+    if not issubclass(sender, SearchMixin):
+        return
+
+    get_search_models.cache_clear()
+    get_reverse_dependencies.cache_clear()
+    get_dependency_graph.cache_clear()
+
+
 @functools.lru_cache()
 def get_handler(sender):
     """
@@ -79,21 +113,57 @@ def get_handler(sender):
     return getattr(module, handler_name)
 
 
+@functools.lru_cache()
+def load_backend(backend_path):
+    """
+    Instantiates the index backend given by its dotted path.
+    """
+    logger.info("Using index backend '{}'...".format(backend_path))
+    (backend_module, backend_name) = backend_path.rsplit(sep=".", maxsplit=1)
+    module = importlib.import_module(backend_module)
+    return getattr(module, backend_name)()
+
+
+@functools.lru_cache()
+def get_backend(sender):
+    """
+    Returns the index backend (see 'ELASTICSEARCH_INDEX_BACKEND') which
+    processes updates of sender, if any.
+    """
+    backend_path = getattr(settings, "ELASTICSEARCH_INDEX_BACKEND", None)
+    if sender in get_search_models():
+        backend_path = sender._search_meta().backend
+    if backend_path is None:
+        return None
+
+    return load_backend(backend_path)
+
+
 def is_suspended(sender, instance):
     """
     TBD
     """
     global SUSPENDED_MODELS
 
-    if sender is None or not isinstance(instance, sender):
+    if sender is None or (instance is not None and not isinstance(instance, sender)):
         sender = type(instance)
-    for models in SUSPENDED_MODELS:
+    for models, records in SUSPENDED_MODELS:
         if sender in models:
             return True
 
     return False
 
 
+def record_suspended(sender, pks):
+    """
+    Records the updates of the records of sender given by pks which were
+    suppressed by active 'suspended_updates' contexts.
+    """
+    for models, records in SUSPENDED_MODELS:
+        if sender in models:
+            records[sender].update(pks)
+
+
 def is_indexed(sender, instance):
     """
     TBD
@@ -106,6 +176,15 @@ def is_indexed(sender, instance):
     return True
 
 
+def is_tracked(sender):
+    """
+    Evaluates whether updates of the records of sender affect any index.
+    """
+    return is_indexed(sender, None) or bool(
+        get_dependency_graph().get_dependents(sender)
+    )
+
+
 def should_index(sender, instance):
     """
     TBD
@@ -118,42 +197,163 @@ def should_index(sender, instance):
     return sender._search_meta().should_index(instance)
 
 
-def get_dependents(instance):
+def get_dependent_pks(model, pks, instances=None):
     """
-    TBD
+    Resolves the records which depend on the records of model given by pks.
+
+    Dependents are selected by a single query per reverse dependency; those
+    for which updates should not be dispatched, e.g. as their index entries
+    have not changed, are pruned by 'Search.get_dispatch_dependencies' using a
+    single request per chunk of dependents. A customized
+    'should_index_for_dependency' is evaluated on the given instances of the
+    records, if any (e.g., of deleted records, which can no longer be fetched).
+
+    Returns a dictionary of the sets of primary keys found, keyed by model.
     """
     reverse_dependencies = get_reverse_dependencies()
-    dependents = {}
+    dependents = collections.defaultdict(set)
 
-    if (
-        not is_indexed(type(instance), None)
-        and type(instance) not in reverse_dependencies
-    ):
-        logger.debug("Skipping non-depended type '{}'".format(type(instance)))
+    if not is_indexed(model, None) and model not in reverse_dependencies:
+        logger.debug("Skipping non-depended type '{}'".format(model))
         return dependents
 
-    for model_type in list(instance._meta.parents.keys()) + [instance._meta.model]:
-        for model, select_param in reverse_dependencies[model_type]:
-            search_meta = model._search_meta()
-            queryset = search_meta.get_base_qs().filter(**{select_param: instance})
-            if not search_meta.should_index_for_dependency(instance, queryset):
+    pks = list(pks)
+    instances = dict((instance.pk, instance) for instance in instances or ())
+    for model_type in list(model._meta.parents.keys()) + [model]:
+        for dependent, select_param in reverse_dependencies[model_type]:
+            search_meta = dependent._search_meta()
+            if not search_meta.dispatch_dependencies:
+                continue
+
+            # respect implementations which customize the per-instance interface.
+            if type(search_meta).should_index_for_dependency is not (
+                Search.should_index_for_dependency
+            ):
+                missing = [pk for pk in pks if pk not in instances]
+                if missing:
+                    for instance in model._default_manager.filter(pk__in=missing):
+                        instances[instance.pk] = instance
+
+                base_qs = search_meta.get_base_qs()
+                select_pks = [
+                    pk
+                    for pk in pks
+                    if pk in instances
+                    and search_meta.should_index_for_dependency(
+                        instances[pk], base_qs.filter(**{select_param: instances[pk]})
+                    )
+                ]
+            else:
+                select_pks = pks
+
+            if not select_pks:
                 continue
 
-            pk_set = set()
-            for _instance in queryset.iterator():
-                if search_meta.should_dispatch_dependencies(_instance):
-                    pk_set.add(_instance.pk)
+            queryset = search_meta.get_base_qs().filter(
+                **{"{}__in".format(select_param): select_pks}
+            )
+            queryset = search_meta.apply_prefetch_plan(queryset.distinct())
+            pk_set = set(
+                instance.pk
+                for chunk in iterate_chunks(queryset.iterator(CHUNKSIZE), CHUNKSIZE)
+                for instance in search_meta.get_dispatch_dependencies(chunk)
+            )
 
             logger.debug(
                 "- Adding {} '{}' (via {})".format(
-                    len(pk_set), model._meta.verbose_name, select_param
+                    len(pk_set), dependent._meta.verbose_name, select_param
                 )
             )
-            dependents[model] = pk_set
+            dependents[dependent] |= pk_set
 
     return dependents
 
 
+def get_dependents(instance):
+    """
+    Resolves the records which depend on instance (see 'get_dependent_pks').
+    """
+    return get_dependent_pks(instance._meta.model, [instance.pk], instances=[instance])
+
+
+def resolve_dependents(records, instances=None):
+    """
+    Resolves the records which (transitively) depend on the given records,
+    given as a dictionary of sets of primary keys keyed by model, and by
+    their instances, if any (see 'get_dependent_pks').
+
+    Models are visited in the topological order given by the dependency
+    graph such that the dependents of each model are resolved once, using
+    set-based queries, for all of its affected records. Models which form a
+    cycle are visited until no further records are found.
+
+    Returns a dictionary of the given and dependent records in topological
+    order of their models.
+    """
+    graph = get_dependency_graph()
+    resolved = collections.defaultdict(set)
+    for model, pks in records.items():
+        resolved[model] |= set(pks)
+
+    visited = collections.defaultdict(set)
+    while True:
+        pending = [model for model in resolved if resolved[model] - visited[model]]
+        if not pending:
+            break
+
+        model = min(pending, key=graph.get_position)
+        pks = resolved[model] - visited[model]
+        visited[model] |= pks
+
+        model_instances = [i for i in instances or () if i._meta.model is model]
+        dependents = get_dependent_pks(model, pks, instances=model_instances)
+        for dependent, pk_set in dependents.items():
+            resolved[dependent] |= pk_set
+
+    return dict(sorted(resolved.items(), key=lambda item: graph.get_position(item[0])))
+
+
+def index_records(records):
+    """
+    Synchronizes the index entries of the given records, given as a dictionary
+    of sets of primary keys keyed by model, and of their dependents.
+
+    Returns a tuple giving the number of successful and failed items.
+    """
+    return update_records(resolve_dependents(records))
+
+
+def update_records(records):
+    """
+    Synchronizes the index entries of (only) the given records using a single
+    bulk request per indexed model. Models are indexed in the order given.
+
+    Returns a tuple giving the number of successful and failed items.
+    """
+    (success, failed) = (0, 0)
+    for model, pk_set in records.items():
+        model_name = str(model._meta.verbose_name)
+        if not pk_set:
+            continue
+        if not is_indexed(model, None):
+            logger.debug("Skipping indexing of '{}'".format(model_name))
+            continue
+        if is_suspended(model, None):
+            logger.debug("Suspending indexing of '{}'".format(model_name))
+            record_suspended(model, pk_set)
+            continue
+
+        logger.debug(
+            "Dispatching update of {} {} records...".format(len(pk_set), model_name)
+        )
+        result = model._search_meta().bulk_update(pk_set)
+        if result is not None:
+            success += result[0]
+            failed += result[1]
+
+    return (success, failed)
+
+
 def process_update(sender, **kwargs):
     """
     TBD
@@ -164,25 +364,20 @@ def process_update(sender, **kwargs):
     logger.debug("Dispatching 'process_update' on '{}'".format(instance))
 
     # Process index dependencies of `instance`
-    for model, pk_set in get_dependents(instance).items():
-        dep_name = str(model._meta.verbose_name)
+    dependents = resolve_dependents(
+        {instance._meta.model: set([instance.pk])}, instances=[instance]
+    )
+    dependents[instance._meta.model].discard(instance.pk)
+    update_records(dependents)
 
-        if not is_indexed(model, None) or is_suspended(model, None):
-            logger.debug("Skipping dependency indexing for '{}'".format(dep_name))
-            continue
+    if not is_indexed(sender, instance):
+        return
 
-        logger.debug(
-            "Dispatching update of {} {} records...".format(len(pk_set), dep_name)
-        )
-        queryset = model._search_meta().get_base_qs()
-        for record in queryset.filter(pk__in=pk_set).iterator():
-            process_update(model, instance=record)
-
-    if (
-        not is_indexed(sender, instance)
-        or is_suspended(sender, instance)
-        or (signal != signals.post_delete and not should_index(sender, instance))
-    ):
+    if is_suspended(sender, instance):
+        record_suspended(instance._meta.model, [instance.pk])
+        return
+
+    if signal != signals.post_delete and not should_index(sender, instance):
         return
 
     # Process index for `instance`
@@ -240,9 +435,13 @@ def handle_m2m(sender, **kwargs):
         for model, pk_set in instance._inelasticmodels_m2m_dependents.items():
             m2m_name = str(model._meta.verbose_name)
 
-            if not is_indexed(model, None) or is_suspended(model, None):
+            if not is_indexed(model, None):
                 logger.debug("Skipping dispatch of update for '{}'".format(m2m_name))
                 continue
+            if is_suspended(model, None):
+                logger.debug("Suspending dispatch of update for '{}'".format(m2m_name))
+                record_suspended(model, pk_set)
+                continue
 
             logger.debug(
                 "Dispatching update of {} {} records...".format(len(pk_set), m2m_name)
@@ -259,9 +458,13 @@ def handle_m2m(sender, **kwargs):
         parent_model = instance._meta.model
         parent_name = str(instance._meta.verbose_name)
 
-        if not is_indexed(parent_model, None) or is_suspended(parent_model, None):
+        if not is_indexed(parent_model, None):
             logger.debug("Skipping dispatch of update for '{}'".format(parent_name))
             return
+        if is_suspended(parent_model, None):
+            logger.debug("Suspending dispatch of update for '{}'".format(parent_name))
+            record_suspended(parent_model, [instance.pk])
+            return
 
         logger.debug(
             "Dispatching update of {} record {}...".format(parent_name, instance)
@@ -269,6 +472,175 @@ def handle_m2m(sender, **kwargs):
         handle_instance(parent_model, instance=instance, signal=kwargs["signal"])
 
 
+def is_deferred():
+    """
+    Evaluates whether index updates are deferred by the current thread.
+    """
+    if getattr(DEFERRED_UPDATES, "depth", 0):
+        return True
+
+    return getattr(settings, "ELASTICSEARCH_DEFER_UPDATES", False)
+
+
+def get_pending_batch(using):
+    """
+    Returns the batch of deferred updates which is pending on the
+    given database connection, creating it if necessary.
+
+    Within an atomic block, a batch is kept per savepoint and is flushed
+    once the transaction has been committed. As on-commit callbacks are
+    discarded when a transaction (or savepoint) is rolled back, a batch whose
+    callback is no longer registered is discarded along with it; the updates
+    made within a savepoint which is rolled back are thus discarded, while
+    those of the enclosing savepoints are retained.
+    """
+    if getattr(DEFERRED_UPDATES, "batches", None) is None:
+        DEFERRED_UPDATES.batches = {}
+
+    connection = transaction.get_connection(using)
+    savepoint_ids = tuple(sid for sid in connection.savepoint_ids if sid is not None)
+    key = (using, connection.in_atomic_block, savepoint_ids)
+
+    (batch, callback) = DEFERRED_UPDATES.batches.get(key, (None, None))
+    if batch is not None:
+        if callback is None or any(
+            entry[1] is callback for entry in connection.run_on_commit
+        ):
+            return batch
+        logger.debug("Discarding {} deferred updates".format(len(batch)))
+
+    batch = collections.OrderedDict()
+    if connection.in_atomic_block:
+        callback = functools.partial(flush_updates, batch)
+        transaction.on_commit(callback, using=using)
+
+    DEFERRED_UPDATES.batches[key] = (batch, callback)
+    return batch
+
+
+def defer_update(sender, instance, signal):
+    """
+    Records an update of instance in the pending batch of deferred updates.
+
+    Updates are coalesced such that each record is processed (at most) once.
+    """
+    model = type(instance)
+    if not is_tracked(model):
+        logger.debug("Skipping non-depended type '{}'".format(model))
+        return
+
+    # deleted records cannot be resolved once the batch is flushed and so
+    # their dependents are evaluated immediately.
+    dependents = None
+    if signal == signals.post_delete:
+        dependents = get_dependents(instance)
+
+    using = instance._state.db or router.db_for_write(model)
+    key = (instance._meta.model, instance.pk)
+    defer_records(using, {key: (get_signal_name(signal), dependents)})
+
+
+def defer_records(using, updates):
+    """
+    Records the given updates, keyed by (model, pk), in the pending batch of
+    deferred updates of the given database connection.
+    """
+    batch = get_pending_batch(using)
+    for key, update in updates.items():
+        batch.pop(key, None)
+        batch[key] = update
+
+    # outside of 'deferred_updates', only updates of atomic blocks are deferred.
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block and not getattr(DEFERRED_UPDATES, "depth", 0):
+        flush_updates(batch)
+
+
+def flush_updates(batch):
+    """
+    Processes a batch of deferred updates, submitting a single bulk
+    request per indexed model.
+
+    Returns a tuple giving the number of successful and failed items.
+    """
+    batches = getattr(DEFERRED_UPDATES, "batches", None) or {}
+    for key, (pending_batch, callback) in list(batches.items()):
+        if pending_batch is batch:
+            batches.pop(key)
+    if not batch:
+        return (0, 0)
+
+    logger.debug("Flushing {} deferred updates".format(len(batch)))
+
+    records = collections.defaultdict(set)
+    for (model, pk), (op, dependents) in batch.items():
+        records[model].add(pk)
+        for dependent, pk_set in (dependents or {}).items():
+            records[dependent] |= pk_set
+
+    return index_records(records)
+
+
+def handle_records(sender, pks, using=None):
+    """
+    Dispatches updates of the records of sender given by pks and of their
+    dependents, e.g., those affected by bulk operations which do not send
+    signals (see 'managers.SearchQuerySetMixin').
+
+    Updates are processed by the index backend of sender, deferred or
+    processed immediately, as for 'handle_instance'. Note that the
+    (per-instance) 'ELASTICSEARCH_INDEX_HANDLER' is not used.
+    """
+    pks = set(pks)
+    if not pks or not is_tracked(sender):
+        return
+
+    backend = get_backend(sender)
+    model_name = str(sender._meta.verbose_name)
+
+    if backend is not None:
+        logger.debug(
+            "Dispatching index update for {} {} records to {}...".format(
+                len(pks), model_name, backend
+            )
+        )
+        backend.handle_records(sender, pks)
+
+    elif is_deferred():
+        logger.debug(
+            "Deferring index update for {} {} records...".format(len(pks), model_name)
+        )
+        using = using or router.db_for_write(sender)
+        defer_records(using, dict(((sender, pk), ("update", None)) for pk in pks))
+
+    else:
+        logger.debug(
+            "Processing index update for {} {} records...".format(len(pks), model_name)
+        )
+        index_records({sender: pks})
+
+
+@contextmanager
+def deferred_updates():
+    """
+    Defers the index updates made by the current thread (e.g., while serving
+    a request) until the context exits or, within an atomic block, until its
+    transaction has been committed.
+    """
+    DEFERRED_UPDATES.depth = getattr(DEFERRED_UPDATES, "depth", 0) + 1
+
+    try:
+        yield
+    finally:
+        DEFERRED_UPDATES.depth -= 1
+
+        if not DEFERRED_UPDATES.depth:
+            batches = getattr(DEFERRED_UPDATES, "batches", None) or {}
+            for batch, callback in list(batches.values()):
+                if callback is None:
+                    flush_updates(batch)
+
+
 @receiver(signals.post_save)
 @receiver(signals.post_delete)
 def handle_instance(sender, **kwargs):
@@ -278,8 +650,27 @@ def handle_instance(sender, **kwargs):
     (instance, signal) = (kwargs["instance"], kwargs["signal"])
     model_name = str(instance._meta.verbose_name)
     handler = get_handler(type(instance))
+    backend = get_backend(type(instance))
+
+    if handler is None and backend is not None:
+        logger.debug(
+            "Dispatching index update for '{}' ({}) via {} to {}...".format(
+                instance, model_name, get_signal_name(signal), backend
+            )
+        )
 
-    if handler is not None:
+        backend.handle_instance(sender, instance, signal)
+
+    elif handler is None and is_deferred():
+        logger.debug(
+            "Deferring index update for '{}' ({}) via {}...".format(
+                instance, model_name, get_signal_name(signal)
+            )
+        )
+
+        defer_update(sender, instance, signal)
+
+    elif handler is not None:
         logger.debug(
             "Dispatching index update for '{}' ({}) via {}...".format(
                 instance, model_name, get_signal_name(signal)
@@ -299,37 +690,40 @@ def handle_instance(sender, **kwargs):
 
 
 @contextmanager
-def suspended_updates(models=None, permanent=False, slop=timedelta(seconds=10)):
-    """
-    TBD
+def suspended_updates(models=None, permanent=False, slop=None):
     """
-    global SUSPENDED_MODELS
+    Suspends index updates of the given models (by default, all indexed
+    models) for the duration of the context.
 
-    try:
-        search_models = get_search_models()
-        reverse_dependencies = get_reverse_dependencies()
+    The records whose updates are suppressed (including deletions) are
+    recorded and, unless 'permanent' is given, their index entries are
+    synchronized using the bulk path once the context exits. Bulk operations
+    which do not send signals are only recorded if they are made using
+    'managers.SearchQuerySetMixin' (or are given to 'handle_records').
 
-        if models is None:
-            models = search_models
-        models = set(models)
+    Note that 'slop' is no longer used and is retained for compatibility.
+    """
+    global SUSPENDED_MODELS
 
-        start = now() - slop
-        SUSPENDED_MODELS.append(models)
+    if models is None:
+        models = get_search_models()
+    suspension = (set(models), collections.defaultdict(set))
 
+    SUSPENDED_MODELS.append(suspension)
+    try:
         yield
-
     finally:
-        SUSPENDED_MODELS.remove(models)
-
-        if permanent is True:
-            return
+        SUSPENDED_MODELS[:] = [s for s in SUSPENDED_MODELS if s is not suspension]
 
-        for model in models:
-            if is_indexed(model, None):
-                search_meta = model._search_meta()
-                queryset = search_meta.get_qs(since=start)
-                search_meta.bulk_index(queryset)
-            for dependency, select_param in reverse_dependencies[model]:
-                search_meta = dependency._search_meta()
-                queryset = search_meta.get_qs(since=start)
-                search_meta.bulk_index(queryset)
+        records = suspension[1]
+        if permanent is not True and records:
+            graph = get_dependency_graph()
+            logger.debug(
+                "Dispatching {} suspended updates".format(
+                    sum(len(pks) for pks in records.values())
+                )
+            )
+            # updates of models which remain suspended are recorded again.
+            update_records(
+                dict(sorted(records.items(), key=lambda i: graph.get_position(i[0])))
+            )
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inelastic_models", "0002_indexupdate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        verbose_name="ID",
+                        serialize=False,
+                        auto_created=True,
+                        primary_key=True,
+                    ),
+                ),
+                ("label", models.CharField(max_length=255)),
+                ("index", models.CharField(max_length=255)),
+                ("selection", models.CharField(max_length=255, blank=True)),
+                ("last_pk", models.CharField(max_length=255, blank=True)),
+                (
+                    "started_on",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="indexcheckpoint",
+            constraint=models.UniqueConstraint(
+                fields=("label", "index", "selection"), name="unique_index_checkpoint"
+            ),
+        ),
+    ]
@@ -3,3 +3,6 @@ from .base import SearchTestRunner
 from .receivers import *
 from .commands import *
 from .fields import *
+from .indexes import *
+from .backends import *
+from .managers import *
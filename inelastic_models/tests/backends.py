@@ -0,0 +1,144 @@
+from unittest import mock
+import io
+
+from django_dynamic_fixture import G
+from django.core.management import call_command
+from django.db import connection
+from django.utils.timezone import now
+from django import test
+
+from inelastic_models.backends import QueueBackend
+from inelastic_models.models import IndexUpdate
+from inelastic_models.models.test import Model
+from inelastic_models.receivers import get_backend
+
+from .base import FakeClientMixin, FakeTransport
+
+
+class QueueBackendTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the queueing and processing of index updates by 'QueueBackend'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        Model._search_meta().backend = "inelastic_models.backends.QueueBackend"
+        get_backend.cache_clear()
+        self.backend = get_backend(Model)
+
+    def tearDown(self):
+        get_backend.cache_clear()
+
+        super().tearDown()
+
+    def test_enqueue(self):
+        self.assertIsInstance(self.backend, QueueBackend)
+
+        tm = G(Model, name="Test", test_list=None, test_m2m=[])
+        for i in range(3):
+            tm.name = "Test{}".format(i)
+            tm.save()
+
+        self.assertEqual(self.transport.requests, [])
+        update = IndexUpdate.objects.get()
+        self.assertEqual(
+            (update.label, update.object_id), (Model._meta.label, str(tm.pk))
+        )
+
+    def test_process(self):
+        tms = [G(Model, test_list=None, test_m2m=[]) for i in range(3)]
+        self.assertEqual(self.backend.drain(), (3, 0))
+        self.assertEqual(self.get_indexed_ids(), set(str(tm.pk) for tm in tms))
+        self.assertFalse(IndexUpdate.objects.exists())
+
+        tms[0].delete()
+        self.assertEqual(self.backend.drain(), (1, 0))
+        self.assertEqual(self.get_indexed_ids(), set(str(tm.pk) for tm in tms[1:]))
+
+    def test_retry(self):
+        tm = G(Model, test_list=None, test_m2m=[])
+        FakeTransport.failing_ids = set([str(tm.pk)])
+
+        self.assertEqual(self.backend.drain(), (1, 1))
+        update = IndexUpdate.objects.get()
+        self.assertEqual(update.attempts, 1)
+        self.assertGreater(update.available_on, now())
+        self.assertEqual(self.backend.get_pending(), [])
+
+        FakeTransport.failing_ids = set()
+        IndexUpdate.objects.update(available_on=now())
+        call_command("process_index_queue")
+        self.assertFalse(IndexUpdate.objects.exists())
+        self.assertEqual(self.get_indexed_ids(), set([str(tm.pk)]))
+
+    def test_failed(self):
+        tms = [G(Model, test_list=None, test_m2m=[]) for i in range(2)]
+        FakeTransport.failing_ids = set(str(tm.pk) for tm in tms)
+
+        # updates are abandoned once they have failed 'max_attempts' times.
+        with self.assertLogs("inelastic_models.backends", "ERROR"):
+            for i in range(self.backend.max_attempts):
+                IndexUpdate.objects.update(available_on=now())
+                self.assertEqual(self.backend.drain(), (2, 2))
+
+        IndexUpdate.objects.update(available_on=now())
+        self.assertEqual(self.backend.get_pending(), [])
+        self.assertEqual(self.backend.get_failed().count(), 2)
+
+        out = io.StringIO()
+        call_command("process_index_queue", list_failed=True, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+        FakeTransport.failing_ids = set()
+        IndexUpdate.objects.filter(object_id=str(tms[0].pk)).delete()
+        call_command("process_index_queue", retry_failed=True)
+        self.assertEqual(self.backend.get_failed().count(), 0)
+        self.assertEqual(self.backend.drain(), (1, 0))
+        self.assertEqual(self.get_indexed_ids(), set([str(tms[1].pk)]))
+
+        IndexUpdate.objects.create(
+            label=Model._meta.label, object_id="0", attempts=self.backend.max_attempts
+        )
+        call_command("process_index_queue", purge_failed=True)
+        self.assertFalse(IndexUpdate.objects.exists())
+
+    def test_claim(self):
+        tm = G(Model, test_list=None, test_m2m=[])
+
+        # claimed updates are not available to other workers.
+        (update,) = self.backend.claim()
+        self.assertEqual(update.object_id, str(tm.pk))
+        self.assertEqual(self.backend.get_pending(), [])
+
+        IndexUpdate.objects.update(available_on=now())
+        self.assertEqual(self.backend.get_pending(), [update])
+
+    def test_retry_requeued(self):
+        tm = G(Model, test_list=None, test_m2m=[])
+
+        def requeue(records):
+            tm.save()
+            raise RuntimeError("Failed")
+
+        # updates queued again while being processed remain pending as queued.
+        with mock.patch("inelastic_models.backends.index_records", side_effect=requeue):
+            self.assertEqual(self.backend.process(), (1, 1))
+
+        update = IndexUpdate.objects.get()
+        self.assertEqual((update.attempts, update.last_error), (0, ""))
+        self.assertEqual(self.backend.get_pending(), [update])
+
+    def test_enqueue_without_upsert(self):
+        features = connection.features
+        with mock.patch.multiple(
+            features,
+            supports_update_conflicts=False,
+            supports_update_conflicts_with_target=False,
+        ):
+            tm = G(Model, name="Test", test_list=None, test_m2m=[])
+            IndexUpdate.objects.update(attempts=1)
+            tm.save()
+
+        update = IndexUpdate.objects.get()
+        self.assertEqual((update.object_id, update.attempts), (str(tm.pk), 0))
@@ -1,6 +1,21 @@
+from urllib.parse import unquote
+import fnmatch
+import json
+
+from elastic_transport import (
+    ApiResponseMeta,
+    HttpHeaders,
+    NodeConfig,
+    Transport,
+    TransportApiResponse,
+)
+from elasticsearch import Elasticsearch
 from django_dynamic_fixture import G
 from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 
+from inelastic_models.indexes import clear_search_registry, queryset_iterator
 from inelastic_models.models.test import Model, SearchFieldModel
 from inelastic_models.receivers import get_search_models
 
@@ -18,7 +33,30 @@ class SearchTestRunner(DiscoverRunner):
                 model._search_meta().put_mapping()
 
 
-class SearchBaseTestCase(object):
+class PrepareQueriesMixin(object):
+    """
+    Provides assertions on the queries issued while preparing documents.
+    """
+
+    def assertPrepareNumQueries(self, search, queryset, num=0):
+        """
+        Asserts that preparing each document of queryset (after the related
+        records given by the prefetch plan of search have been fetched)
+        issues at most num queries.
+        """
+        queryset = search.apply_prefetch_plan(queryset)
+        for instance in queryset_iterator(queryset):
+            with CaptureQueriesContext(connection) as context:
+                search.prepare(instance)
+
+            msg = "Preparing '{}' issued {} queries (expected at most {}):\n{}"
+            queries = "\n".join(q["sql"] for q in context.captured_queries)
+            self.assertLessEqual(
+                len(context), num, msg.format(instance, len(context), num, queries)
+            )
+
+
+class SearchBaseTestCase(PrepareQueriesMixin):
     """
     TBD
     """
@@ -26,10 +64,250 @@ class SearchBaseTestCase(object):
     def _pre_setup(self):
         super()._pre_setup()
 
+        clear_search_registry()
         for model in get_search_models():
-            model._search_meta().bulk_clear()
+            model._search_meta().bulk_clear(refresh="true", wait_for_completion=True)
 
     def create_instance(self, **kwargs):
         params = {"test_list": None, "test_m2m": []}
         params.update(kwargs)
         return G(Model, **params)
+
+
+class FakeTransport(Transport):
+    """
+    An offline transport which records requests and acknowledges bulk actions.
+
+    Documents written by bulk actions or single document requests are
+    retained and served by 'mget' requests. Items whose '_id' is given in
+    'failing_ids' are rejected.
+
+    Indices and their aliases are tracked by index management requests;
+    documents written through an alias are retained by its index. Searches
+    match all documents, regardless of their query.
+    """
+
+    failing_ids = set()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.requests = []
+        self.documents = {}
+        self.indices = {}
+        self.tasks = {}
+
+    def resolve(self, name):
+        indices = [i for (i, aliases) in self.indices.items() if name in aliases]
+        return indices[0] if len(indices) == 1 else name
+
+    def get_bulk_items(self, body):
+        (items, lines) = ([], iter(body))
+        for line in lines:
+            if isinstance(line, (bytes, str)):
+                line = json.loads(line)
+            ((op_type, action),) = line.items()
+            key = (self.resolve(action.get("_index")), str(action.get("_id")))
+
+            source = None
+            if op_type != "delete":
+                source = next(lines, None)
+                if isinstance(source, (bytes, str)):
+                    source = json.loads(source)
+
+            status = 201 if op_type != "delete" else 200
+            item = {"_index": action.get("_index"), "_id": action.get("_id")}
+            if str(action.get("_id")) in self.failing_ids:
+                (status, item["error"]) = (400, {"type": "fake_exception"})
+            elif op_type == "delete":
+                self.documents.pop(key, None)
+            else:
+                self.documents[key] = source
+            item["status"] = status
+            items.append({op_type: item})
+
+        return items
+
+    def get_mget_docs(self, index, body):
+        docs = []
+        for _id in body.get("ids", []):
+            doc = {"_index": index, "_id": str(_id), "found": False}
+            if (index, str(_id)) in self.documents:
+                doc["found"] = True
+                doc["_source"] = self.documents[(index, str(_id))]
+            docs.append(doc)
+
+        return docs
+
+    def get_search_response(self, index, body):
+        """
+        Serves a search of all documents of index (or, within a point in
+        time, of the index named by its id) sorted by primary key, in
+        descending order if so requested.
+        """
+        index = self.resolve(body["pit"]["id"] if "pit" in body else index)
+        descending = body.get("sort") == [{"pk": "desc"}]
+        pks = sorted(
+            (int(_id) for (i, _id) in self.documents if i == index),
+            reverse=descending,
+        )
+        if "search_after" in body:
+            (after,) = body["search_after"]
+            pks = [pk for pk in pks if (pk < after if descending else pk > after)]
+
+        hits = [
+            {"_index": index, "_id": str(pk), "sort": [pk]}
+            for pk in pks[: body.get("size", 10)]
+        ]
+        if body.get("_source", True) is not False:
+            for hit in hits:
+                hit["_source"] = dict(self.documents[(index, hit["_id"])])
+        return {"pit_id": index, "hits": {"hits": hits}}
+
+    def get_delete_by_query_response(self, target):
+        """
+        Removes all documents of the given indices (regardless of the query),
+        unless the request waits for completion, by a task which is completed
+        immediately.
+        """
+        path = target.split("?")[0]
+        indices = [self.resolve(i) for i in path.strip("/").split("/")[0].split(",")]
+        removed = [k for k in self.documents if k[0] in indices]
+        for key in removed:
+            self.documents.pop(key)
+
+        response = {"deleted": len(removed), "failures": []}
+        if "wait_for_completion=false" not in target:
+            return response
+
+        task_id = "fake:{}".format(len(self.tasks) + 1)
+        self.tasks[task_id] = {"completed": True, "response": response}
+        return {"task": task_id}
+
+    def get_alias_response(self, path):
+        parts = path.strip("/").split("/")
+        if parts[0] == "_alias":
+            matches = [i for (i, a) in self.indices.items() if parts[1] in a]
+        else:
+            matches = fnmatch.filter(self.indices, parts[0])
+
+        response = dict(
+            (i, {"aliases": dict((a, {}) for a in self.indices[i])}) for i in matches
+        )
+        return (200 if response else 404, response)
+
+    def get_index_response(self, method, path, body):
+        """
+        Handles index management requests; returns a (status, response)
+        pair, or None if path is not such a request.
+        """
+        parts = path.strip("/").split("/")
+        if parts == ["_aliases"]:
+            for action in body["actions"]:
+                ((op_type, params),) = action.items()
+                if op_type == "add":
+                    self.indices[params["index"]].add(params["alias"])
+                elif op_type == "remove":
+                    self.indices[params["index"]].discard(params["alias"])
+                elif op_type == "remove_index":
+                    self.indices.pop(params["index"], None)
+            return (200, {"acknowledged": True})
+        elif parts[0] == "_alias" or parts[-1] == "_alias":
+            return self.get_alias_response(path)
+        elif len(parts) == 1 and not parts[0].startswith("_"):
+            if method == "HEAD":
+                exists = parts[0] in self.indices or self.resolve(parts[0]) in (
+                    self.indices
+                )
+                return (200 if exists else 404, {})
+            elif method == "PUT":
+                self.indices[parts[0]] = set()
+            elif method == "DELETE":
+                self.indices.pop(parts[0], None)
+                for key in [k for k in self.documents if k[0] == parts[0]]:
+                    self.documents.pop(key)
+            return (200, {"acknowledged": True})
+
+        return None
+
+    def perform_request(self, method, target, *, body=None, **kwargs):
+        self.requests.append((method, target, body))
+
+        path = target.split("?")[0]
+        (status, response) = (200, {})
+        if path.endswith("/_bulk"):
+            items = self.get_bulk_items(body)
+            errors = any("error" in list(i.values())[0] for i in items)
+            response = {"took": 0, "errors": errors, "items": items}
+        elif path.endswith("/_mget"):
+            index = self.resolve(path.strip("/").split("/")[0])
+            response = {"docs": self.get_mget_docs(index, body)}
+        elif path.endswith("/_delete_by_query"):
+            response = self.get_delete_by_query_response(target)
+        elif path.startswith("/_tasks/"):
+            response = self.tasks[unquote(path.split("/")[-1])]
+        elif path.endswith("/_pit"):
+            response = {"id": self.resolve(path.strip("/").split("/")[0])}
+            if method == "DELETE":
+                response = {"succeeded": True, "num_freed": 1}
+        elif path.endswith("/_search"):
+            index = path.strip("/").split("/")[0]
+            response = self.get_search_response(index, body or {})
+        elif "/_doc/" in path:
+            (index, _id) = path.strip("/").split("/_doc/")
+            index = self.resolve(index)
+            if method == "DELETE":
+                self.documents.pop((index, _id), None)
+            else:
+                self.documents[(index, _id)] = body
+            response = {"_index": index, "_id": _id, "result": "updated"}
+        else:
+            index_response = self.get_index_response(method, path, body)
+            if index_response is not None:
+                (status, response) = index_response
+
+        if status == 404 and method != "HEAD":
+            response = {"error": {"type": "index_not_found_exception"}, "status": 404}
+
+        meta = ApiResponseMeta(
+            status=status,
+            http_version="1.1",
+            headers=HttpHeaders({"x-elastic-product": "Elasticsearch"}),
+            duration=0.0,
+            node=NodeConfig("http", "localhost", 9200),
+        )
+        return TransportApiResponse(meta, response)
+
+
+def get_fake_client(**kwargs):
+    return Elasticsearch(
+        hosts=["http://localhost:9200"], transport_class=FakeTransport, **kwargs
+    )
+
+
+class FakeClientMixin(object):
+    """
+    Attaches a single offline client (see 'get_fake_client') to the 'Search'
+    instances of all search models; its transport is given by 'transport'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        client = get_fake_client()
+        for model in get_search_models():
+            model._search_meta().client = client
+        self.transport = client.transport
+
+    def tearDown(self):
+        FakeTransport.failing_ids = set()
+        clear_search_registry()
+
+        super().tearDown()
+
+    def get_bulk_requests(self):
+        return [r for r in self.transport.requests if "_bulk" in r[1]]
+
+    def get_indexed_ids(self, model=Model):
+        index = model._search_meta().get_index()
+        return set(_id for (_index, _id) in self.transport.documents if _index == index)
@@ -4,8 +4,16 @@ import elasticsearch.exceptions
 from django_dynamic_fixture import G
 from django import test
 
-from inelastic_models.models.test import Model, SearchFieldModel
-from inelastic_models.tests.base import SearchBaseTestCase
+from inelastic_models.fields import (
+    AttributeField,
+    CharField,
+    CharListField,
+    MultiObjectField,
+    ObjectField,
+)
+from inelastic_models.models.test import Model, ModelSearch, SearchFieldModel
+from inelastic_models.receivers import suspended_updates
+from inelastic_models.tests.base import PrepareQueriesMixin, SearchBaseTestCase
 
 
 class SearchFieldTestCase(SearchBaseTestCase, test.TestCase):
@@ -99,3 +107,109 @@ class SearchFieldTestCase(SearchBaseTestCase, test.TestCase):
     def test_ngram_field(self):
         query = Model.search.query("match", ngram="est")
         self.assertEqual(len(query.execute().hits), 2)
+
+
+class FieldMappingCacheTestCase(test.SimpleTestCase):
+    """
+    Validates memoization of fields, mappings and settings.
+    """
+
+    def tearDown(self):
+        ModelSearch.other_fields.pop("cached", None)
+
+        super().tearDown()
+
+    def test_get_fields(self):
+        search = Model._search_meta()
+        fields = search.get_fields()
+        self.assertIs(fields["name"], search.get_fields()["name"])
+        self.assertIs(fields["name"], Model._search_meta().get_fields()["name"])
+
+        # returned values may be changed without affecting the cache
+        fields.pop("name")
+        search.get_mapping()["properties"].pop("name")
+        self.assertIn("name", search.get_fields())
+        self.assertIn("name", search.get_mapping()["properties"])
+
+    def test_schema_change(self):
+        search = Model._search_meta()
+        self.assertNotIn("cached", search.get_fields())
+        self.assertIsNone(search.get_field_type("cached"))
+
+        ModelSearch.other_fields["cached"] = CharField("name")
+        self.assertIn("cached", search.get_fields())
+        self.assertIn("cached", search.get_mapping()["properties"])
+        self.assertEqual(search.get_field_type("cached"), "keyword")
+
+
+class AttributeFieldTestCase(PrepareQueriesMixin, test.TestCase):
+    """
+    Validates attribute access and relation analysis of 'fields.AttributeField'.
+    """
+
+    def test_get_from_instance(self):
+        with suspended_updates(permanent=True):
+            tm = G(Model, name="Test1", test_list=None, test_m2m=[])
+            tsfm = G(SearchFieldModel, related=None)
+
+        field = AttributeField("related.name")
+        self.assertIsNone(field.get_from_instance(tsfm))
+
+        tsfm.related = tm
+        self.assertEqual(field.get_from_instance(tsfm), "Test1")
+        self.assertIsNone(AttributeField("missing").get_from_instance(tsfm))
+
+    def test_related_lookups(self):
+        field = AttributeField("related.test_list.models")
+        self.assertEqual(
+            field.get_related_lookups(SearchFieldModel),
+            (["related", "related__test_list"], ["related__test_list__models"]),
+        )
+        self.assertEqual(
+            AttributeField("related.name").get_related_lookups(SearchFieldModel),
+            (["related"], []),
+        )
+        self.assertEqual(
+            AttributeField("count_m2m").get_related_lookups(Model), ([], [])
+        )
+
+    def test_prefetch_plan(self):
+        self.assertEqual(Model._search_meta().get_prefetch_plan(), ([], []))
+        self.assertEqual(
+            SearchFieldModel._search_meta().get_prefetch_plan(),
+            (["related"], ["model_set", "models"]),
+        )
+
+        field = ObjectField(
+            "related", model=Model, other_fields={"list": CharListField("test_m2m")}
+        )
+        self.assertEqual(
+            field.get_related_lookups(SearchFieldModel),
+            (["related"], ["related__test_m2m"]),
+        )
+
+        field = MultiObjectField(
+            "model_set",
+            model=Model,
+            attribute_fields=["test_list.modified_on"],
+        )
+        self.assertEqual(
+            field.get_related_lookups(SearchFieldModel),
+            ([], ["model_set", "model_set__test_list"]),
+        )
+
+    def test_prepare_queries(self):
+        with suspended_updates(permanent=True):
+            for i in range(3):
+                tm = G(Model, name="Test{}".format(i), test_list=None, test_m2m=[])
+                tsfm = G(SearchFieldModel, related=tm)
+                tsfm.models.add(tm)
+                # Adding through rows directly dispatches no m2m_changed update.
+                Model.test_m2m.through.objects.create(model=tm, searchfieldmodel=tsfm)
+
+        search = SearchFieldModel._search_meta()
+        self.assertPrepareNumQueries(search, SearchFieldModel.objects.all())
+
+        # 'count_m2m' is a property which issues a query per document.
+        search = Model._search_meta()
+        self.assertPrepareNumQueries(search, Model.objects.all(), num=1)
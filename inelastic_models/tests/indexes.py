@@ -0,0 +1,721 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import datetime
+from unittest import mock
+
+from django_dynamic_fixture import G
+from django.core.management import call_command
+from django import test
+
+from inelastic_models.indexes import (
+    bulk_index_partition,
+    clear_search_registry,
+    diff_sorted,
+    get_pk_ranges,
+    iterate_pks,
+    queryset_iterator,
+    TypeAwareSerializableHit,
+)
+from inelastic_models.models import IndexCheckpoint
+from inelastic_models.models.test import (
+    Model,
+    SearchFieldModel,
+    TEST_MODEL_EXCLUDE_NAME,
+)
+from inelastic_models.receivers import suspended_updates
+from .base import FakeClientMixin, FakeTransport
+
+
+class QuerysetIteratorTestCase(test.TestCase):
+    """
+    Validates behavior of 'indexes.queryset_iterator'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.instances = [
+                G(Model, name=name, test_list=None, test_m2m=[])
+                for name in ["c", "a", "b", "a", "d"]
+            ]
+
+    def test_pk_ordering(self):
+        queryset = Model.objects.order_by()
+
+        # one query per (full) chunk and a final, partial chunk
+        with self.assertNumQueries(3):
+            pks = [i.pk for i in queryset_iterator(queryset, chunksize=2)]
+        self.assertEqual(pks, sorted(i.pk for i in self.instances))
+
+    def test_composite_ordering(self):
+        queryset = Model.objects.order_by("name", "-id")
+        names = [(i.name, i.pk) for i in queryset_iterator(queryset, chunksize=2)]
+        self.assertEqual(names, [(i.name, i.pk) for i in queryset])
+
+        queryset = Model.objects.order_by()
+        names = [
+            i.name for i in queryset_iterator(queryset, chunksize=3, ordering=["-name"])
+        ]
+        self.assertEqual(names, ["d", "c", "b", "a", "a"])
+
+    def test_nullable_ordering(self):
+        with suspended_updates(permanent=True):
+            self.instances[1].date = datetime.date(2020, 1, 1)
+            self.instances[1].save()
+            related = G(SearchFieldModel)
+            self.instances[2].test_m2m.add(related)
+
+        # nullable keys and keys across to-many relations are not seekable
+        for ordering in (["date"], ["-date", "name"], ["test_m2m__id"]):
+            queryset = Model.objects.order_by(*ordering)
+            pks = [i.pk for i in queryset_iterator(queryset, chunksize=2)]
+            self.assertEqual(pks, [i.pk for i in queryset])
+
+        queryset = Model.objects.order_by("test_list__related__name")
+        pks = [i.pk for i in queryset_iterator(queryset, chunksize=2)]
+        self.assertEqual(sorted(pks), sorted(i.pk for i in self.instances))
+
+    def test_sliced_queryset(self):
+        queryset = Model.objects.order_by("pk")[:3]
+        pks = [i.pk for i in queryset_iterator(queryset, chunksize=2)]
+        self.assertEqual(pks, [i.pk for i in self.instances[:3]])
+
+    def test_empty_queryset(self):
+        queryset = Model.objects.none()
+        self.assertEqual(list(queryset_iterator(queryset)), [])
+
+    def test_iterate_pks(self):
+        queryset = Model.objects.order_by("-name")
+        with self.assertNumQueries(3):
+            pks = list(iterate_pks(queryset, chunksize=2))
+        self.assertEqual(pks, sorted(i.pk for i in self.instances))
+
+
+class DiffSortedTestCase(test.SimpleTestCase):
+    """
+    Validates behavior of 'indexes.diff_sorted'.
+    """
+
+    def test_diff_sorted(self):
+        diff = list(diff_sorted([1, 2, 4, 6, 7], iter([2, 3, 4, 8, 9])))
+        self.assertEqual(
+            diff,
+            [
+                (1, "left"),
+                (3, "right"),
+                (6, "left"),
+                (7, "left"),
+                (8, "right"),
+                (9, "right"),
+            ],
+        )
+        self.assertEqual(list(diff_sorted([], [1])), [(1, "right")])
+        self.assertEqual(list(diff_sorted([1, 2], [1, 2])), [])
+
+    def test_unsorted(self):
+        with self.assertRaises(ValueError):
+            list(diff_sorted([1, 3, 2], [1, 2, 3]))
+
+
+class PkRangesTestCase(test.TestCase):
+    """
+    Validates behavior of 'indexes.get_pk_ranges'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.instances = [
+                G(Model, name="Test{}".format(i), test_list=None, test_m2m=[])
+                for i in range(5)
+            ]
+
+    def test_pk_ranges(self):
+        queryset = Model.objects.all()
+        pk_ranges = get_pk_ranges(queryset, 2)
+        self.assertEqual(len(pk_ranges), 2)
+        self.assertIsNone(pk_ranges[0][0])
+        self.assertIsNone(pk_ranges[-1][1])
+
+        pks = []
+        for lower, upper in pk_ranges:
+            partition = queryset
+            if lower is not None:
+                partition = partition.filter(pk__gte=lower)
+            if upper is not None:
+                partition = partition.filter(pk__lt=upper)
+            pks.extend(partition.values_list("pk", flat=True))
+        self.assertEqual(sorted(pks), sorted(i.pk for i in self.instances))
+
+    def test_pk_ranges_bounds(self):
+        self.assertEqual(len(get_pk_ranges(Model.objects.all(), 10)), 5)
+        self.assertEqual(get_pk_ranges(Model.objects.none(), 2), [])
+
+
+class BulkIndexTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the bulk request pipeline of 'indexes.Search'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.instances = [
+                G(Model, name="Test{}".format(i), test_list=None, test_m2m=[])
+                for i in range(5)
+            ]
+
+        self.search = Model._search_meta()
+
+    def test_bulk_index(self):
+        queryset = Model.objects.order_by()
+        self.assertEqual(self.search.bulk_index(queryset), (5, 0))
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+
+    def test_bulk_index_failures(self):
+        FakeTransport.failing_ids = set([str(self.instances[0].pk)])
+
+        queryset = Model.objects.order_by()
+        self.assertEqual(self.search.bulk_index(queryset), (4, 1))
+
+    def test_bulk_index_chunk_bytes(self):
+        self.search.max_chunk_bytes = 1
+
+        queryset = Model.objects.order_by()
+        self.assertEqual(self.search.bulk_index(queryset), (5, 0))
+        self.assertEqual(len(self.get_bulk_requests()), 5)
+
+    def test_bulk_refresh(self):
+        queryset = Model.objects.order_by()
+        self.search.bulk_index(queryset)
+        self.assertIn("refresh=true", self.get_bulk_requests()[0][1])
+
+        self.transport.requests = []
+        self.search.bulk_index(queryset, refresh="wait_for")
+        self.assertIn("refresh=wait_for", self.get_bulk_requests()[0][1])
+
+        # the periodic refresh of the live index is not suspended.
+        self.transport.requests = []
+        self.search.bulk_index(queryset, refresh="end")
+        self.assertNotIn("refresh", self.get_bulk_requests()[0][1])
+
+        targets = [r[1] for r in self.transport.requests]
+        self.assertNotIn("/_settings", " ".join(targets))
+        self.assertIn("/_refresh", targets[-1])
+
+        # that of an index which is not yet live is, by default.
+        self.transport.requests = []
+        self.search.bulk_index(queryset, index=self.search.get_index_version())
+        self.assertNotIn("refresh", self.get_bulk_requests()[0][1])
+
+        targets = [r[1] for r in self.transport.requests]
+        self.assertIn("/_settings", targets[-4])
+        self.assertIn("/_bulk", targets[-3])
+        self.assertIn("/_settings", targets[-2])
+        self.assertIn("/_refresh", targets[-1])
+
+        with self.assertRaises(ValueError):
+            self.search.bulk_index(queryset, refresh="false")
+
+    def test_changed_instances(self):
+        queryset = Model.objects.order_by()
+        self.assertEqual(len(self.search.get_changed_instances(queryset.all())), 5)
+
+        self.search.bulk_index(queryset.all())
+        self.transport.requests = []
+        self.assertEqual(self.search.get_changed_instances(queryset.all()), [])
+        self.assertEqual(len(self.transport.requests), 1)
+
+        with suspended_updates(permanent=True):
+            self.instances[0].name = "Changed"
+            self.instances[0].save()
+        self.assertEqual(
+            self.search.get_changed_instances(queryset.all(), fields=["email"]), []
+        )
+        self.assertEqual(
+            self.search.get_changed_instances(queryset.all()), [self.instances[0]]
+        )
+        self.assertEqual(
+            self.search.bulk_index(queryset.all(), changed_only=True), (1, 0)
+        )
+
+    def test_checkpoint(self):
+        queryset = Model.objects.order_by()
+        FakeTransport.failing_ids = set([str(self.instances[2].pk)])
+
+        with mock.patch.object(self.search, "get_chunksize", return_value=2):
+            checkpoint = self.search.get_checkpoint()
+            self.assertEqual(
+                self.search.bulk_index(queryset, checkpoint=checkpoint), (4, 1)
+            )
+
+            # the checkpoint is not advanced past the failed chunk.
+            checkpoint = self.search.get_checkpoint(resume=True)
+            self.assertEqual(checkpoint.last_pk, str(self.instances[1].pk))
+
+            FakeTransport.failing_ids = set()
+            self.assertEqual(
+                self.search.bulk_index(queryset, checkpoint=checkpoint), (3, 0)
+            )
+            self.assertFalse(IndexCheckpoint.objects.exists())
+
+            # progress is discarded unless resumed.
+            checkpoint = self.search.get_checkpoint()
+            self.search.save_checkpoint(checkpoint, self.instances[3].pk)
+            self.assertEqual(self.search.get_checkpoint().last_pk, "")
+
+            # progress is only resumed for the same selection of records.
+            self.search.save_checkpoint(checkpoint, self.instances[3].pk)
+            selected = self.search.get_checkpoint(resume=True, selection="--since=1D")
+            self.assertEqual(selected.last_pk, "")
+            self.assertEqual(
+                self.search.get_checkpoint(resume=True).last_pk,
+                str(self.instances[3].pk),
+            )
+
+    def test_update_index_checkpoint(self):
+        FakeTransport.failing_ids = set([str(self.instances[2].pk)])
+
+        # progress is only recorded by runs which may be resumed.
+        with mock.patch.object(self.search, "bulk_index_checkpointed") as checkpointed:
+            call_command("update_index", "inelastic_models.model")
+        checkpointed.assert_not_called()
+        self.assertFalse(IndexCheckpoint.objects.exists())
+
+        call_command("update_index", "inelastic_models.model", checkpoint=True)
+        self.assertTrue(IndexCheckpoint.objects.exists())
+
+        FakeTransport.failing_ids = set()
+        call_command("update_index", "inelastic_models.model", resume=True)
+        self.assertFalse(IndexCheckpoint.objects.exists())
+
+    def test_iterate(self):
+        self.search.bulk_index(Model.objects.order_by())
+        transport = self.transport
+
+        transport.requests = []
+        hits = list(self.search.iterate(page_size=2))
+        self.assertEqual(
+            [hit.pk for hit in hits], sorted(instance.pk for instance in self.instances)
+        )
+        searches = [r for r in transport.requests if r[1] == "/_search"]
+        self.assertEqual(len(searches), 3)
+        self.assertEqual(searches[-1][2]["search_after"], [hits[3].pk])
+        self.assertEqual(transport.requests[-1][:2], ("DELETE", "/_pit"))
+
+        # the point in time is closed along with the iterator.
+        transport.requests = []
+        with closing(self.search.iterate(page_size=2)) as hits:
+            next(hits)
+        self.assertEqual(transport.requests[-1][:2], ("DELETE", "/_pit"))
+
+    def test_iterate_raw(self):
+        self.search.bulk_index(Model.objects.order_by())
+
+        hits = list(self.search.iterate(page_size=2, raw=True))
+        self.assertEqual(len(hits), 5)
+        self.assertIsInstance(hits[0], dict)
+        self.assertEqual(hits[0]["_source"]["name"], self.instances[0].name)
+
+    def test_hit_decoder(self):
+        decoder = self.search.get_hit_decoder()
+        self.assertIs(decoder, self.search.get_hit_decoder())
+
+        # only fields whose values require conversion are decoded.
+        self.assertEqual([name for (name, _) in decoder.converters], ["date"])
+        source = decoder.decode({"date": "2020-01-02", "name": "Test"})
+        self.assertEqual(source, {"date": datetime.date(2020, 1, 2), "name": "Test"})
+
+        hit = TypeAwareSerializableHit(
+            {"_id": "1", "_source": {"date": "2020-01-02"}}, self.search
+        )
+        self.assertEqual(hit.date, datetime.date(2020, 1, 2))
+
+    def test_get_instances(self):
+        self.search.bulk_index(Model.objects.order_by())
+        with suspended_updates(permanent=True):
+            self.instances[2].delete()
+
+        s = self.search.get_search().sort({"pk": "desc"})
+        transport = self.transport
+        transport.requests = []
+        with self.assertNumQueries(1):
+            instances = self.search.get_instances(s)
+
+        # instances follow the order of the hits; missing records are omitted.
+        expected = [self.instances[i] for i in (4, 3, 1, 0)]
+        self.assertEqual(instances, expected)
+        ((method, target, body),) = transport.requests
+        self.assertIs(body["_source"], False)
+
+    def test_reconcile(self):
+        queryset = Model.objects.order_by()
+        self.search.bulk_index(queryset)
+        self.assertEqual(
+            list(self.search.iterate_index_pks(chunksize=2)),
+            sorted(instance.pk for instance in self.instances),
+        )
+
+        with suspended_updates(permanent=True):
+            deleted_pk = self.instances[1].pk
+            self.instances[1].delete()
+            created = G(Model, name="Created", test_list=None, test_m2m=[])
+
+        self.assertEqual(self.search.reconcile(), (2, 0))
+        pks = sorted(instance.pk for instance in queryset)
+        self.assertEqual(list(self.search.iterate_index_pks()), pks)
+        self.assertNotIn(deleted_pk, pks)
+        self.assertIn(created.pk, pks)
+
+        self.assertEqual(self.search.bulk_prune(), (0, 0))
+
+    def test_bulk_clear(self):
+        queryset = Model.objects.order_by()
+        self.search.bulk_index(queryset)
+        self.assertEqual(self.search.bulk_clear(), (5, 0))
+        self.assertEqual(self.transport.documents, {})
+
+        ((method, target, body),) = [
+            r for r in self.transport.requests if "_delete_by_query" in r[1]
+        ]
+        self.assertIn("wait_for_completion=false", target)
+        self.assertIn("slices=auto", target)
+
+        # small indices may be cleared without polling a task.
+        self.search.bulk_index(queryset)
+        with mock.patch.object(self.search, "wait_for_task") as wait_for_task:
+            result = self.search.bulk_clear(wait_for_completion=True)
+        self.assertEqual(result, (5, 0))
+        self.assertFalse(wait_for_task.called)
+        self.assertEqual(self.transport.documents, {})
+
+    def test_fingerprints(self):
+        queryset = Model.objects.order_by()
+        self.search.bulk_index(queryset.all())
+
+        instance = self.instances[0]
+        (index, _id) = (self.search.get_index(), str(instance.pk))
+        document = self.transport.documents[(index, _id)]
+        fingerprint = document.pop(self.search.fingerprint_field)
+        self.assertEqual(fingerprint, self.search.get_fingerprint(document))
+        self.assertEqual(
+            fingerprint, self.search.get_fingerprint(self.search.prepare(instance))
+        )
+
+        # entries lacking a fingerprint are considered to have changed.
+        self.assertEqual(self.search.get_changed_instances([instance]), [instance])
+
+        # only fingerprints are fetched from the index.
+        self.transport.requests = []
+        self.search.get_changed_instances(queryset.all())
+        ((method, target, body),) = self.transport.requests
+        self.assertIn("_source_includes", target)
+
+    def test_changed_documents_prepared_once(self):
+        queryset = Model.objects.order_by()
+        with mock.patch.object(
+            self.search, "prepare", wraps=self.search.prepare
+        ) as prepare:
+            self.assertEqual(
+                self.search.bulk_index(queryset, changed_only=True), (5, 0)
+            )
+        self.assertEqual(prepare.call_count, 5)
+
+    def test_fingerprint_cache(self):
+        self.search.fingerprint_cache_size = 2
+
+        instance = self.instances[0]
+        self.search.index_instance(instance)
+        self.search.index_instance(self.instances[1])
+        self.search.index_instance(self.instances[2])
+        self.assertEqual(len(self.search.fingerprint_cache), 2)
+
+        # cached fingerprints are compared without making requests.
+        self.transport.requests = []
+        self.assertEqual(self.search.get_changed_instances(self.instances[1:3]), [])
+        self.assertEqual(self.transport.requests, [])
+
+        # evicted fingerprints are fetched from the index.
+        self.assertEqual(self.search.get_changed_instances([instance]), [])
+        self.assertEqual(len(self.transport.requests), 1)
+
+        with suspended_updates(permanent=True):
+            instance.name = "Changed"
+            instance.save()
+        self.assertEqual(self.search.get_changed_instances([instance]), [instance])
+
+
+class IndexVersionTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the installation of versioned indices behind an alias.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.instances = [
+                G(Model, name="Test{}".format(i), test_list=None, test_m2m=[])
+                for i in range(3)
+            ]
+
+        self.search = Model._search_meta()
+
+    def test_rebuild_index(self):
+        self.search.put_mapping()
+        (live_index,) = self.search.get_live_indices()
+        self.assertTrue(live_index.startswith(self.search.get_index() + "--"))
+
+        self.assertEqual(self.search.rebuild_index(Model.objects.order_by()), (3, 0))
+        (index,) = self.search.get_live_indices()
+        self.assertNotEqual(index, live_index)
+
+        # documents are written to the new index, which replaces the previous.
+        self.assertEqual(self.search.get_index_versions(), [index])
+        self.assertEqual(
+            sorted(k for (i, k) in self.transport.documents if i == index),
+            sorted(str(instance.pk) for instance in self.instances),
+        )
+
+        # the live index is only refreshed once it has been filled.
+        bulk_requests = [r for r in self.transport.requests if "_bulk" in r[1]]
+        self.assertNotIn("refresh", bulk_requests[0][1])
+
+    def test_index_versions_retained(self):
+        self.search.put_mapping()
+        (first_index,) = self.search.get_live_indices()
+
+        self.search.index_versions_retained = 1
+        self.search.put_mapping()
+        self.search.put_mapping()
+
+        versions = self.search.get_index_versions()
+        self.assertEqual(len(versions), 2)
+        self.assertNotIn(first_index, versions)
+        self.assertEqual(self.search.get_live_indices(), versions[-1:])
+
+    def test_failed_rebuild(self):
+        self.search.put_mapping()
+        (live_index,) = self.search.get_live_indices()
+
+        with self.assertRaises(RuntimeError):
+            with mock.patch.object(self.search, "bulk_index", side_effect=RuntimeError):
+                self.search.rebuild_index(Model.objects.order_by())
+
+        self.assertEqual(self.search.get_live_indices(), [live_index])
+        self.assertEqual(self.search.get_index_versions(), [live_index])
+
+    def test_dual_write(self):
+        self.search.put_mapping()
+        (live_index,) = self.search.get_live_indices()
+
+        (bulk_index, results) = (self.search.bulk_index, [])
+
+        def fill(qs, **kwargs):
+            results.append(bulk_index(qs, **kwargs))
+            if len(results) > 1:
+                return results[-1]
+
+            # writes made by this process reach both indices.
+            self.assertEqual(len(self.search.get_write_indices()), 2)
+            with suspended_updates(permanent=True):
+                self.instances[0].name = "Written"
+                self.instances[0].save()
+            self.search.index_instance(self.instances[0])
+            document = self.transport.documents[(live_index, str(self.instances[0].pk))]
+            self.assertEqual(document["name"], "Written")
+
+            # writes unseen by this process are caught up.
+            with suspended_updates(permanent=True):
+                self.instances[1].name = "Unseen"
+                self.instances[1].save()
+            return results[-1]
+
+        with mock.patch.object(self.search, "bulk_index", side_effect=fill):
+            self.search.rebuild_index(Model.objects.order_by())
+
+        self.assertEqual(results, [(3, 0), (2, 0)])
+        (index,) = self.search.get_live_indices()
+        self.assertEqual(self.search.get_write_indices(), [self.search.get_index()])
+        for instance in self.instances[:2]:
+            document = self.transport.documents[(index, str(instance.pk))]
+            self.assertEqual(document["name"], instance.name)
+
+    def test_rebuild_indices_unavailable(self):
+        self.search.put_mapping()
+        response = (403, {"error": {"type": "security_exception"}, "status": 403})
+
+        # writes are made to the live index if the lookup fails.
+        with mock.patch.object(
+            self.transport, "get_alias_response", return_value=response
+        ):
+            self.assertEqual(self.search.get_write_indices(), [self.search.get_index()])
+            self.search.index_instance(self.instances[0])
+
+            # or to the indices last fetched, if any.
+            self.search.rebuild_indices = (None, ["rebuilt"])
+            self.assertEqual(
+                self.search.get_write_indices(), [self.search.get_index(), "rebuilt"]
+            )
+
+    def test_rebuild_reconcile(self):
+        (bulk_index, results) = (self.search.bulk_index, [])
+
+        def fill(qs, **kwargs):
+            results.append(bulk_index(qs, **kwargs))
+            if len(results) == 1:
+                # records removed or no longer selected during the rebuild.
+                with suspended_updates(permanent=True):
+                    self.instances[0].delete()
+                    self.instances[1].name = TEST_MODEL_EXCLUDE_NAME
+                    self.instances[1].save()
+            return results[-1]
+
+        for date_field in ("modified_on", None):
+            with self.subTest(date_field=date_field):
+                self.search.put_mapping()
+                self.search.date_field = date_field
+                with mock.patch.object(self.search, "bulk_index", side_effect=fill):
+                    self.search.rebuild_index(Model.objects.order_by())
+
+                (index,) = self.search.get_live_indices()
+                self.assertEqual(
+                    sorted(k for (i, k) in self.transport.documents if i == index),
+                    [str(self.instances[2].pk)],
+                )
+
+                results[:] = []
+                with suspended_updates(permanent=True):
+                    self.instances[0].save()
+                    self.instances[1].name = "Test1"
+                    self.instances[1].save()
+
+    def test_resume_rebuild(self):
+        self.search.put_mapping()
+        (live_index,) = self.search.get_live_indices()
+
+        (stream_bulk, results) = (self.search.stream_bulk, [])
+
+        def interrupt(actions, **kwargs):
+            if len(results) == 1:
+                raise RuntimeError
+            results.append(stream_bulk(actions, **kwargs))
+            return results[-1]
+
+        with mock.patch.object(self.search, "get_chunksize", return_value=2):
+            with mock.patch.object(self.search, "stream_bulk", side_effect=interrupt):
+                with self.assertRaises(RuntimeError):
+                    self.search.rebuild_index(Model.objects.order_by(), checkpoint=True)
+
+            # the interrupted index is retained but not written to.
+            self.assertEqual(self.search.get_live_indices(), [live_index])
+            (index,) = [i for i in self.search.get_index_versions() if i != live_index]
+            self.assertEqual(self.search.get_write_indices(), [self.search.get_index()])
+
+            result = self.search.rebuild_index(Model.objects.order_by(), resume=True)
+            self.assertEqual(result, (1, 0))
+
+        self.assertEqual(self.search.get_live_indices(), [index])
+        self.assertFalse(IndexCheckpoint.objects.exists())
+
+    def test_recreate(self):
+        self.search.put_mapping()
+        (live_index,) = self.search.get_live_indices()
+        self.search.bulk_index(Model.objects.order_by())
+
+        self.assertEqual(self.search.bulk_clear(recreate=True), (0, 0))
+        (index,) = self.search.get_live_indices()
+        self.assertNotEqual(index, live_index)
+        self.assertEqual(self.transport.documents, {})
+
+    def test_unversioned_index(self):
+        alias = self.search.get_index()
+        self.search.create_index(index=alias)
+        self.search.put_mapping()
+
+        (index,) = self.search.get_live_indices()
+        self.assertNotEqual(index, alias)
+        self.assertNotIn(alias, self.transport.indices)
+
+
+class ParallelBulkIndexTestCase(FakeClientMixin, test.TransactionTestCase):
+    """
+    Validates bulk requests submitted via 'parallel_bulk'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            for i in range(5):
+                G(Model, name="Test{}".format(i), test_list=None, test_m2m=[])
+
+        self.search = Model._search_meta()
+        self.search.bulk_thread_count = 2
+        self.search.bulk_queue_size = 1
+
+    def test_bulk_options(self):
+        connections = {"default": {"BULK_OPTIONS": {"thread_count": 4}}}
+        with self.settings(ELASTICSEARCH_CONNECTIONS=connections):
+            self.search.bulk_queue_size = None
+            self.assertEqual(self.search.get_bulk_options(), {"thread_count": 2})
+
+            self.search.bulk_thread_count = None
+            self.assertEqual(self.search.get_bulk_options(), {"thread_count": 4})
+
+    def test_parallel_bulk_index(self):
+        self.search.max_chunk_bytes = 1
+
+        queryset = Model.objects.order_by()
+        self.assertEqual(self.search.bulk_index(queryset), (5, 0))
+
+        requests = [r for r in self.transport.requests if "_bulk" in r[1]]
+        self.assertEqual(len(requests), 5)
+
+    def test_bulk_update(self):
+        pks = Model.objects.values_list("pk", flat=True)
+        with mock.patch("inelastic_models.indexes.parallel_bulk") as parallel_bulk:
+            self.assertEqual(self.search.bulk_update(list(pks)), (5, 0))
+        self.assertFalse(parallel_bulk.called)
+
+    def test_failed_partition(self):
+        def failing_partition(label, query, pk_range, *args):
+            if pk_range[0] is None:
+                raise RuntimeError("Worker failed")
+            return bulk_index_partition(label, query, pk_range, *args)
+
+        # workers are run as threads which share the fake client of this process
+        queryset = Model.objects.order_by()
+        with mock.patch.multiple(
+            "inelastic_models.indexes",
+            ProcessPoolExecutor=ThreadPoolExecutor,
+            init_worker=lambda: None,
+            bulk_index_partition=failing_partition,
+        ):
+            (success, failed) = self.search.bulk_index(queryset, workers=2)
+
+        # the records of the failed (first) partition are counted as failed
+        self.assertEqual((success, failed), (2, 3))
+        self.assertEqual(len(self.transport.documents), 2)
+
+
+class SearchRegistryTestCase(test.SimpleTestCase):
+    """
+    Validates registration of 'Search' instances.
+    """
+
+    def tearDown(self):
+        clear_search_registry()
+
+        super().tearDown()
+
+    def test_search_registry(self):
+        search = Model._search_meta()
+        self.assertIs(search, Model._search_meta())
+        self.assertIsNot(search, SearchFieldModel._search_meta())
+
+        clear_search_registry()
+        self.assertIsNot(search, Model._search_meta())
@@ -0,0 +1,67 @@
+from django_dynamic_fixture import G
+from django import test
+
+from inelastic_models.managers import SearchQuerySet
+from inelastic_models.models.test import Model, SearchFieldModel
+from inelastic_models.receivers import suspended_updates
+
+from .base import FakeClientMixin
+
+
+class SearchQuerySetTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the index updates dispatched by bulk operations of 'SearchQuerySet'.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.related = G(SearchFieldModel, related=None)
+            self.instances = [
+                G(Model, name="Test{}".format(i), test_list=self.related, test_m2m=[])
+                for i in range(3)
+            ]
+
+        self.queryset = SearchQuerySet(model=Model)
+
+    def get_document(self, instance):
+        index = instance._search_meta().get_index()
+        return self.transport.documents.get((index, str(instance.pk)), None)
+
+    def test_update(self):
+        self.queryset.filter(pk=self.instances[0].pk).update(name="Changed")
+
+        # one request per affected model: 'Model' and its dependent.
+        self.assertEqual(len(self.get_bulk_requests()), 2)
+        self.assertEqual(self.get_document(self.instances[0])["name"], "Changed")
+        self.assertIsNone(self.get_document(self.instances[1]))
+        self.assertIsNotNone(self.get_document(self.related))
+
+    def test_bulk_create(self):
+        instances = self.queryset.bulk_create(
+            [Model(name="Created{}".format(i)) for i in range(3)]
+        )
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        for instance in instances:
+            self.assertEqual(self.get_document(instance)["name"], instance.name)
+
+    def test_bulk_update(self):
+        for instance in self.instances:
+            instance.name = "Updated{}".format(instance.pk)
+        self.queryset.bulk_update(self.instances, ["name"])
+
+        self.assertEqual(len(self.get_bulk_requests()), 2)
+        for instance in self.instances:
+            self.assertEqual(self.get_document(instance)["name"], instance.name)
+
+    @test.override_settings(ELASTICSEARCH_DEFER_UPDATES=True)
+    def test_deferred_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.queryset.update(email="test@example.com")
+            self.queryset.filter(pk=self.instances[0].pk).update(name="Changed")
+            self.assertEqual(self.get_bulk_requests(), [])
+
+        self.assertEqual(len(self.get_bulk_requests()), 2)
+        self.assertEqual(self.get_document(self.instances[0])["name"], "Changed")
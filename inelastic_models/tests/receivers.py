@@ -1,11 +1,32 @@
+from unittest import mock
+import collections
+import io
+
 from django_dynamic_fixture import G
+from django.core.management import call_command
+from django.apps import apps
 from django.db import transaction
 from django import test
 
-from inelastic_models.models.test import Model, TEST_MODEL_EXCLUDE_NAME
-from inelastic_models.receivers import get_search_models, suspended_updates
+from inelastic_models.dependencies import DependencyGraph
+from inelastic_models.models import IndexUpdate
+from inelastic_models.models.test import (
+    Model,
+    SearchFieldModel,
+    SearchFieldModelSearch,
+    TEST_MODEL_EXCLUDE_NAME,
+)
+from inelastic_models.receivers import (
+    get_dependency_graph,
+    get_dependent_pks,
+    get_search_models,
+    index_records,
+    resolve_dependents,
+    suspended_updates,
+    deferred_updates,
+)
 
-from .base import SearchBaseTestCase
+from .base import FakeClientMixin, SearchBaseTestCase
 
 
 class SearchPostSaveTestCase(SearchBaseTestCase, test.TestCase):
@@ -66,3 +87,263 @@ class SearchPostSaveTestCase(SearchBaseTestCase, test.TestCase):
             self.assertEqual(Model.search.count(), 0)
 
         self.assertEqual(Model.search.count(), 1)
+
+
+@test.override_settings(ELASTICSEARCH_DEFER_UPDATES=True)
+class DeferredUpdatesTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the deferral of index updates until transactions are committed.
+    """
+
+    def test_deferred_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tm = G(Model, name="Test", test_list=None, test_m2m=[])
+            for i in range(5):
+                tm.name = "Test{}".format(i)
+                tm.save()
+            tms = [G(Model, test_list=None, test_m2m=[]) for i in range(3)]
+            self.assertEqual(self.get_bulk_requests(), [])
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        self.assertEqual(self.get_indexed_ids(), set(str(m.pk) for m in [tm] + tms))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tm.name = TEST_MODEL_EXCLUDE_NAME
+            tm.save()
+            tms[0].delete()
+
+        self.assertEqual(len(self.get_bulk_requests()), 2)
+        self.assertEqual(self.get_indexed_ids(), set(str(m.pk) for m in tms[1:]))
+
+    def test_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    G(Model, name="Test", test_list=None, test_m2m=[])
+                    raise RuntimeError()
+            except RuntimeError:
+                pass
+
+            tm = G(Model, name="Test", test_list=None, test_m2m=[])
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        self.assertEqual(self.get_indexed_ids(), set([str(tm.pk)]))
+
+    def test_savepoint_rollback(self):
+        with mock.patch(
+            "inelastic_models.receivers.index_records", wraps=index_records
+        ) as flushed:
+            with self.captureOnCommitCallbacks(execute=True):
+                tm = G(Model, name="Test", test_list=None, test_m2m=[])
+                try:
+                    with transaction.atomic():
+                        G(Model, name="Test", test_list=None, test_m2m=[])
+                        raise RuntimeError()
+                except RuntimeError:
+                    pass
+
+            # updates of the enclosing block are retained.
+            self.assertEqual(
+                [c.args[0] for c in flushed.call_args_list], [{Model: set([tm.pk])}]
+            )
+
+            flushed.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        with transaction.atomic():
+                            G(Model, name="Test", test_list=None, test_m2m=[])
+                        raise RuntimeError()
+                except RuntimeError:
+                    pass
+
+            # updates of committed savepoints are discarded with the outer block.
+            flushed.assert_not_called()
+
+    @test.override_settings(ELASTICSEARCH_DEFER_UPDATES=False)
+    def test_deferred_updates_context(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with deferred_updates():
+                tms = [G(Model, test_list=None, test_m2m=[]) for i in range(3)]
+            self.assertEqual(self.get_bulk_requests(), [])
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        self.assertEqual(self.get_indexed_ids(), set(str(m.pk) for m in tms))
+
+
+class DependencyResolutionTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the set-based resolution of index dependencies.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        with suspended_updates(permanent=True):
+            self.related = G(SearchFieldModel, related=None)
+            self.instances = [
+                G(Model, test_list=self.related, test_m2m=[]) for i in range(3)
+            ]
+
+    def get_mget_requests(self):
+        return [r for r in self.transport.requests if "_mget" in r[1]]
+
+    def test_get_dependent_pks(self):
+        pks = [instance.pk for instance in self.instances]
+        search_meta = SearchFieldModel._search_meta()
+        (select_related, prefetch_related) = search_meta.get_prefetch_plan()
+        self.transport.requests = []
+        with self.assertNumQueries(1 + len(prefetch_related)):
+            dependents = get_dependent_pks(Model, pks)
+        self.assertEqual(dependents, {SearchFieldModel: set([self.related.pk])})
+        self.assertEqual(len(self.get_mget_requests()), 1)
+
+        # dependents whose index entries have not changed are pruned.
+        search_meta.bulk_index(search_meta.get_base_qs())
+        self.assertEqual(get_dependent_pks(Model, pks), {SearchFieldModel: set()})
+        self.assertEqual(len(self.get_mget_requests()), 2)
+
+    def test_resolve_unchanged_dependents(self):
+        reverse_dependencies = collections.defaultdict(list)
+        reverse_dependencies[Model].append((SearchFieldModel, "models"))
+        reverse_dependencies[SearchFieldModel].append((Model, "test_list"))
+
+        search_meta = SearchFieldModel._search_meta()
+        search_meta.bulk_index(search_meta.get_base_qs())
+
+        # the dependents of unchanged dependents are not resolved.
+        with mock.patch(
+            "inelastic_models.receivers.get_reverse_dependencies",
+            return_value=reverse_dependencies,
+        ):
+            resolved = resolve_dependents({Model: set([self.instances[0].pk])})
+
+        self.assertEqual(
+            resolved, {Model: set([self.instances[0].pk]), SearchFieldModel: set()}
+        )
+
+    def test_resolve_cyclic_dependents(self):
+        reverse_dependencies = collections.defaultdict(list)
+        reverse_dependencies[Model].append((SearchFieldModel, "models"))
+        reverse_dependencies[SearchFieldModel].append((Model, "test_list"))
+
+        with mock.patch(
+            "inelastic_models.receivers.get_reverse_dependencies",
+            return_value=reverse_dependencies,
+        ):
+            resolved = resolve_dependents({Model: set([self.instances[0].pk])})
+
+        self.assertEqual(
+            resolved,
+            {
+                Model: set(instance.pk for instance in self.instances),
+                SearchFieldModel: set([self.related.pk]),
+            },
+        )
+
+    def test_deleted_dependency(self):
+        for defer_updates in (False, True):
+            instance = self.instances.pop()
+            with mock.patch.object(
+                SearchFieldModelSearch,
+                "should_index_for_dependency",
+                autospec=True,
+                return_value=True,
+            ) as should_index_for_dependency:
+                with self.settings(ELASTICSEARCH_DEFER_UPDATES=defer_updates):
+                    with self.captureOnCommitCallbacks(execute=True):
+                        instance.delete()
+
+            # deleted records are given to the hook as they cannot be fetched.
+            self.assertEqual(should_index_for_dependency.call_count, 1)
+            self.assertIs(should_index_for_dependency.call_args.args[1], instance)
+
+    def test_process_update(self):
+        self.instances[0].name = "Changed"
+        self.instances[0].save()
+
+        index = SearchFieldModel._search_meta().get_index()
+        requests = [r for r in self.transport.requests if "_bulk" in r[1]]
+        self.assertEqual(len(requests), 1)
+        self.assertIn((index, str(self.related.pk)), self.transport.documents)
+
+
+class DependencyGraphTestCase(test.SimpleTestCase):
+    """
+    Validates the compilation of the graph of index dependencies.
+    """
+
+    def test_dependency_graph(self):
+        graph = get_dependency_graph()
+        self.assertEqual(graph.cycles, [])
+        self.assertLess(graph.get_position(Model), graph.get_position(SearchFieldModel))
+        self.assertEqual(graph.get_dependents(Model), [(SearchFieldModel, "models")])
+
+    def test_cyclic_dependency_graph(self):
+        reverse_dependencies = {
+            Model: [(SearchFieldModel, "models")],
+            SearchFieldModel: [(Model, "test_list"), (IndexUpdate, "pk")],
+        }
+        graph = DependencyGraph(reverse_dependencies)
+        self.assertEqual(graph.cycles, [[Model, SearchFieldModel]])
+        self.assertEqual(graph.order, [Model, SearchFieldModel, IndexUpdate])
+
+    def test_compiled_when_ready(self):
+        reverse_dependencies = collections.defaultdict(list)
+        reverse_dependencies[Model].append((SearchFieldModel, "models"))
+        reverse_dependencies[SearchFieldModel].append((Model, "test_list"))
+
+        get_dependency_graph.cache_clear()
+        try:
+            with mock.patch(
+                "inelastic_models.receivers.get_reverse_dependencies",
+                return_value=reverse_dependencies,
+            ):
+                with self.assertLogs("inelastic_models.receivers", "WARNING"):
+                    apps.get_app_config("inelastic_models").ready()
+
+            self.assertEqual(get_dependency_graph.cache_info().currsize, 1)
+            self.assertEqual(get_dependency_graph().cycles, [[Model, SearchFieldModel]])
+        finally:
+            get_dependency_graph.cache_clear()
+
+    def test_show_dependencies(self):
+        out = io.StringIO()
+        call_command("show_dependencies", stdout=out)
+        self.assertIn("-> inelastic_models.SearchFieldModel", out.getvalue())
+
+
+class SuspendedUpdatesTestCase(FakeClientMixin, test.TestCase):
+    """
+    Validates the updates dispatched once 'suspended_updates' exits.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.instance = G(Model, name="Test", test_list=None, test_m2m=[])
+        self.transport.requests = []
+
+    def test_suspended_updates(self):
+        with suspended_updates(models=[Model]):
+            tms = [G(Model, test_list=None, test_m2m=[]) for i in range(3)]
+            self.instance.delete()
+            self.assertEqual(self.transport.requests, [])
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        self.assertEqual(self.get_indexed_ids(), set(str(tm.pk) for tm in tms))
+
+    def test_nested_suspended_updates(self):
+        with suspended_updates(models=[Model]):
+            with suspended_updates(models=[Model]):
+                tm = G(Model, test_list=None, test_m2m=[])
+            self.assertEqual(self.transport.requests, [])
+
+        self.assertEqual(len(self.get_bulk_requests()), 1)
+        self.assertIn(str(tm.pk), self.get_indexed_ids())
+
+    def test_permanent_suspended_updates(self):
+        with suspended_updates(models=[Model], permanent=True):
+            G(Model, test_list=None, test_m2m=[])
+
+        self.assertEqual(self.transport.requests, [])
@@ -1,4 +1,4 @@
-from itertools import chain
+from itertools import chain, islice
 import importlib
 import logging
 
@@ -34,6 +34,18 @@ def merge(items, overwrite=True):
         raise ValueError("Collision while merging. Values: %s" % items)
 
 
+def iterate_chunks(iterable, chunksize):
+    """
+    Lazily groups the items of iterable into lists of (at most) chunksize.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
 def autoload_submodules(submodules):
     """
     Autoload the given submodules for all apps in INSTALLED_APPS.